@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the CECILL License
+# (see guidata/__init__.py for details)
+
+"""
+Serialization benchmarks
+========================
+
+Measure DataSet `serialize`/`deserialize` and `write_object_list`/
+`read_object_list` with the HDF5 (guidata.hdf5io) and .ini
+(guidata.userconfigio) backends, for a matrix of item counts, array sizes
+and object list lengths.
+
+Each case runs in its own Python process, so that its peak resident set
+size (RSS) can be measured. Results (operations per second, MB/s, peak
+RSS) are written as JSON, to compare runs::
+
+    python benchmarks/bench_serialization.py --output before.json
+    python benchmarks/bench_serialization.py --quick
+
+The .ini backend has no object list support: these cases are skipped.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import os.path as osp
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ITEM_COUNTS = (10, 100)
+ARRAY_SIZES = (0, 1000, 100000)
+LIST_LENGTHS = (10, 100)
+QUICK_ITEM_COUNTS = (10, )
+QUICK_ARRAY_SIZES = (0, 1000)
+QUICK_LIST_LENGTHS = (10, )
+BACKENDS = ("hdf5", "ini")
+OPERATIONS = ("serialize", "deserialize", "write_object_list",
+              "read_object_list")
+
+
+def make_dataset_class(item_count, array_size):
+    """Return a DataSet class with `item_count` scalar items (floats,
+    integers and strings) and a float array item of `array_size` elements
+    (if `array_size` is not zero)"""
+    import numpy as np
+    from guidata.dataset.datatypes import DataSet
+    from guidata.dataset.dataitems import (FloatItem, IntItem, StringItem,
+                                           FloatArrayItem)
+    namespace = {}
+    for index in range(item_count):
+        name = "item%03d" % index
+        kind = index % 3
+        if kind == 0:
+            namespace[name] = FloatItem(name, default=index * 0.5)
+        elif kind == 1:
+            namespace[name] = IntItem(name, default=index)
+        else:
+            namespace[name] = StringItem(name, default="value %d" % index)
+    if array_size:
+        namespace["array"] = FloatArrayItem("array",
+                                            default=np.linspace(0., 1.,
+                                                                array_size))
+    return type(DataSet)("BenchDataSet", (DataSet, ), namespace)
+
+
+class HDF5Backend(object):
+    """HDF5 file backend"""
+
+    def __init__(self, directory):
+        self.filename = osp.join(directory, "bench.h5")
+
+    def write(self, func):
+        from guidata.hdf5io import HDF5Writer
+        writer = HDF5Writer(self.filename)
+        func(writer)
+        writer.close()
+
+    def read(self, func):
+        from guidata.hdf5io import HDF5Reader
+        reader = HDF5Reader(self.filename)
+        func(reader)
+        reader.close()
+
+    def size(self):
+        return osp.getsize(self.filename)
+
+
+class IniBackend(object):
+    """.ini file backend (the file is saved after each written value)"""
+    section, option = "bench", "dataset"
+
+    def __init__(self, directory):
+        from guidata.userconfig import UserConfig
+        # UserConfig files are stored in the home directory (see __main__)
+        self.conf = UserConfig({})
+        self.conf.set_application("guidata_bench", None, load=False)
+
+    def write(self, func):
+        from guidata.userconfigio import UserConfigWriter
+        func(UserConfigWriter(self.conf, self.section, self.option))
+
+    def read(self, func):
+        from guidata.userconfigio import UserConfigReader
+        func(UserConfigReader(self.conf, self.section, self.option))
+
+    def size(self):
+        return osp.getsize(str(self.conf.filename()))
+
+
+def run_case(case, min_time):
+    """Run benchmark `case` (dictionary) in this process and return the
+    result dictionary"""
+    with tempfile.TemporaryDirectory(prefix="guidata_bench_") as directory:
+        return _run_case(case, min_time, directory)
+
+
+def _run_case(case, min_time, directory):
+    """Run benchmark `case`, writing files in `directory`"""
+    klass = make_dataset_class(case["items"], case["array_size"])
+    dataset = klass()
+    seq = [klass() for _index in range(case["list_length"])]
+    backend = {"hdf5": HDF5Backend, "ini": IniBackend}[case["backend"]](
+        directory)
+    operation = case["operation"]
+    if operation in ("serialize", "deserialize"):
+        def write():
+            backend.write(dataset.serialize)
+
+        def read():
+            backend.read(klass().deserialize)
+    else:
+        def write():
+            backend.write(lambda writer: writer.write_object_list(seq,
+                                                                  "list"))
+
+        def read():
+            backend.read(lambda reader: reader.read_object_list("list",
+                                                                klass))
+    func = write if operation in ("serialize", "write_object_list") else read
+    write()  # data to be read (and warm-up)
+    func()
+    count, start = 0, time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    nbytes = backend.size()
+    result = dict(case)
+    result.update(ops_per_s=count / elapsed,
+                  mb_per_s=count * nbytes / elapsed / 1e6,
+                  nbytes=nbytes, repeat=count,
+                  # Linux: kilobytes
+                  peak_rss_kb=resource.getrusage(
+                      resource.RUSAGE_SELF).ru_maxrss)
+    return result
+
+
+def get_cases(quick=False, backends=BACKENDS):
+    """Return the list of benchmark cases"""
+    if quick:
+        matrix = QUICK_ITEM_COUNTS, QUICK_ARRAY_SIZES, QUICK_LIST_LENGTHS
+    else:
+        matrix = ITEM_COUNTS, ARRAY_SIZES, LIST_LENGTHS
+    cases = []
+    for backend, operation in itertools.product(backends, OPERATIONS):
+        if backend == "ini" and operation.endswith("object_list"):
+            # Not supported by the .ini backend
+            continue
+        for items, array_size, list_length in itertools.product(*matrix):
+            if not operation.endswith("object_list"):
+                if list_length != matrix[2][0]:
+                    continue
+                list_length = 0
+            cases.append(dict(backend=backend, operation=operation,
+                              items=items, array_size=array_size,
+                              list_length=list_length))
+    return cases
+
+
+def run_subprocess(case, min_time, home):
+    """Run benchmark `case` in a new Python process"""
+    env = dict(os.environ, HOME=home)
+    args = [sys.executable, osp.abspath(__file__), "--case", json.dumps(case),
+            "--min-time", str(min_time)]
+    output = subprocess.run(args, env=env, check=True, stdout=subprocess.PIPE,
+                            universal_newlines=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def get_metadata():
+    """Return the description of the benchmark environment"""
+    import numpy as np
+    import h5py
+    return dict(date=datetime.datetime.now().isoformat(),
+                python=platform.python_version(),
+                platform=platform.platform(),
+                numpy=np.__version__, h5py=h5py.__version__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="JSON result file")
+    parser.add_argument("--quick", action="store_true",
+                        help="run a reduced matrix of cases")
+    parser.add_argument("--backend", action="append", choices=BACKENDS,
+                        help="backend to benchmark (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.,
+                        help="minimum duration of each case (seconds)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.case:
+        # Child process: run one case
+        print(json.dumps(run_case(json.loads(options.case),
+                                  options.min_time)))
+        return
+    results = []
+    with tempfile.TemporaryDirectory(prefix="guidata_bench_home_") as home:
+        os.makedirs(osp.join(home, ".config"))
+        for case in get_cases(options.quick, options.backend or BACKENDS):
+            result = run_subprocess(case, options.min_time, home)
+            print("%(backend)-5s %(operation)-18s items=%(items)-4d "
+                  "array=%(array_size)-7d list=%(list_length)-4d "
+                  "%(ops_per_s)10.1f ops/s %(mb_per_s)9.2f MB/s "
+                  "%(peak_rss_kb)8d kB" % result, file=sys.stderr)
+            results.append(result)
+    report = dict(metadata=get_metadata(), results=results)
+    if options.output:
+        with open(options.output, "w") as fdesc:
+            json.dump(report, fdesc, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
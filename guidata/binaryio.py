@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the CECILL License
+# (see guidata/__init__.py for details)
+
+"""
+Reader and Writer for the serialization of DataSets into a compact binary
+format (see guidata.hdf5io for the HDF5 reader/writer)
+
+The data is a header followed by one record per written value: the value
+path (group names joined by "/"), a type tag and the value payload.
+NumPy arrays are written as raw buffers aligned on `ALIGNMENT` bytes, so
+that the reader returns them as (read-only) views on the data, without any
+copy: bytes object, memoryview or memory-mapped file.
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+from guidata.userconfigio import BaseIOHandler, WriterMixin, ReaderMixin
+
+
+MAGIC = b"GDB1"
+#: Alignment (in bytes, relative to the start of the data) of array buffers
+ALIGNMENT = 64
+
+_KEY = struct.Struct("<H")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_SIZE = struct.Struct("<I")
+_NBYTES = struct.Struct("<Q")
+_INT_MIN, _INT_MAX = -2**63, 2**63 - 1
+
+
+class BinaryWriter(BaseIOHandler, WriterMixin):
+    """
+    Writer for the binary format
+        * filename [string]: file written by `close` (optional: see also
+          `getvalue`)
+    """
+
+    def __init__(self, filename=None):
+        super().__init__()
+        self.filename = filename
+        self.chunks = [MAGIC]
+        self.size = len(MAGIC)
+
+    def _append(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+
+    def _begin_record(self, tag):
+        """Append the current path and the type `tag` of the value"""
+        key = "/".join(self.option).encode("utf-8")
+        self._append(_KEY.pack(len(key)) + key + tag)
+
+    def _append_value(self, val):
+        """Append the type tag and the payload of a scalar or sequence"""
+        if isinstance(val, np.generic):
+            val = val.item()
+        if val is None:
+            self._append(b"N")
+        elif isinstance(val, bool):
+            self._append(b"T" if val else b"F")
+        elif isinstance(val, int) and _INT_MIN <= val <= _INT_MAX:
+            self._append(b"i" + _INT.pack(val))
+        elif isinstance(val, float):
+            self._append(b"d" + _FLOAT.pack(val))
+        elif isinstance(val, str):
+            data = val.encode("utf-8")
+            self._append(b"s" + _SIZE.pack(len(data)) + data)
+        elif isinstance(val, (bytes, bytearray)):
+            self._append(b"b" + _SIZE.pack(len(val)) + bytes(val))
+        elif isinstance(val, int):
+            # Integer out of the 64-bit range
+            data = str(val).encode("ascii")
+            self._append(b"I" + _SIZE.pack(len(data)) + data)
+        elif isinstance(val, (list, tuple)):
+            self._append(b"l" + _SIZE.pack(len(val)))
+            for element in val:
+                self._append_value(element)
+        else:
+            raise NotImplementedError("cannot serialize %r of type %r" %
+                                      (val, type(val)))
+
+    def write_any(self, val):
+        self._begin_record(b"")
+        self._append_value(val)
+
+    write_bool = write_int = write_float = write_sequence = write_any
+
+    def write_none(self):
+        self.write_any(None)
+
+    def write_array(self, val):
+        val = np.asarray(val)
+        self._begin_record(b"")
+        if val.dtype.hasobject:
+            self._append(b"O" + _SIZE.pack(val.ndim)
+                         + b"".join(_NBYTES.pack(dim) for dim in val.shape))
+            self._append_value(val.ravel().tolist())
+            return
+        dtype = val.dtype.str.encode("ascii")
+        header = (b"a" + _SIZE.pack(len(dtype)) + dtype + _SIZE.pack(val.ndim)
+                  + b"".join(_NBYTES.pack(dim) for dim in val.shape)
+                  + _NBYTES.pack(val.nbytes))
+        self._append(header)
+        padding = -self.size % ALIGNMENT
+        if padding:
+            self._append(b"\0" * padding)
+        # Array buffers are joined to the data only in `getvalue`/`close`
+        self._append(np.ascontiguousarray(val).reshape(-1).view(np.uint8))
+
+    def write_object_list(self, seq, group_name):
+        """Write object sequence in group.
+        Objects must implement the DataSet-like `serialize` method"""
+        with self.group(group_name):
+            if seq is None:
+                self.write_none()
+                return
+            self.write_int(len(seq))
+            for index, obj in enumerate(seq):
+                with self.group(str(index)):
+                    if obj is None:
+                        self.write_none()
+                    else:
+                        obj.serialize(self)
+
+    def getvalue(self):
+        """Return the written data (bytes object)"""
+        return b"".join(self.chunks)
+
+    def close(self):
+        """Write the data to file (if a file name was given)"""
+        if self.filename is not None:
+            with open(self.filename, "wb") as fdesc:
+                fdesc.writelines(self.chunks)
+
+
+class BinaryReader(BaseIOHandler, ReaderMixin):
+    """
+    Reader for the binary format
+        * data [bytes-like object]: written data (see `BinaryWriter`)
+        * filename [string]: file name (if no data is given): the file is
+          memory-mapped
+
+    Arrays are read-only views on the data (no copy)
+    """
+
+    def __init__(self, data=None, filename=None):
+        super().__init__()
+        self.filename = filename
+        self.mmap = None
+        if data is None:
+            with open(filename, "rb") as fdesc:
+                self.mmap = mmap.mmap(fdesc.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            data = self.mmap
+        self.data = memoryview(data).cast("B")
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise ValueError("not a guidata binary data")
+        self.values = self._parse()
+
+    def _parse(self):
+        """Return the {path: value} dictionary of the data records"""
+        data = self.data
+        values = {}
+        offset = len(MAGIC)
+        while offset < len(data):
+            (length, ) = _KEY.unpack_from(data, offset)
+            offset += _KEY.size
+            key = str(data[offset:offset + length], "utf-8")
+            values[key], offset = self._parse_value(offset + length)
+        return values
+
+    def _parse_value(self, offset):
+        """Return the value at `offset` and the offset of the next one"""
+        data = self.data
+        tag = data[offset:offset + 1].tobytes()
+        offset += 1
+        if tag == b"N":
+            return None, offset
+        elif tag in b"TF":
+            return tag == b"T", offset
+        elif tag == b"i":
+            return _INT.unpack_from(data, offset)[0], offset + _INT.size
+        elif tag == b"d":
+            return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+        elif tag in (b"s", b"b", b"I"):
+            (size, ) = _SIZE.unpack_from(data, offset)
+            offset += _SIZE.size
+            raw = data[offset:offset + size].tobytes()
+            if tag == b"s":
+                value = raw.decode("utf-8")
+            elif tag == b"I":
+                value = int(raw)
+            else:
+                value = raw
+            return value, offset + size
+        elif tag == b"l":
+            (count, ) = _SIZE.unpack_from(data, offset)
+            offset += _SIZE.size
+            value = []
+            for _index in range(count):
+                element, offset = self._parse_value(offset)
+                value.append(element)
+            return value, offset
+        elif tag == b"a":
+            (size, ) = _SIZE.unpack_from(data, offset)
+            offset += _SIZE.size
+            dtype = np.dtype(data[offset:offset + size].tobytes().decode())
+            shape, offset = self._parse_shape(offset + size)
+            (nbytes, ) = _NBYTES.unpack_from(data, offset)
+            offset += _NBYTES.size
+            offset += -offset % ALIGNMENT
+            value = np.frombuffer(data, dtype=dtype,
+                                  count=nbytes // dtype.itemsize,
+                                  offset=offset).reshape(shape)
+            return value, offset + nbytes
+        elif tag == b"O":
+            shape, offset = self._parse_shape(offset)
+            elements, offset = self._parse_value(offset)
+            value = np.empty(len(elements), dtype=object)
+            value[:] = elements
+            return value.reshape(shape), offset
+        raise ValueError("invalid type tag %r at offset %d" % (tag, offset))
+
+    def _parse_shape(self, offset):
+        """Return the array shape at `offset` and the next offset"""
+        (ndim, ) = _SIZE.unpack_from(self.data, offset)
+        offset += _SIZE.size
+        shape = struct.unpack_from("<%dQ" % ndim, self.data, offset)
+        return shape, offset + ndim * _NBYTES.size
+
+    def read_any(self):
+        return self.values["/".join(self.option)]
+
+    def read_object_list(self, group_name, klass, progress_callback=None):
+        """Read object sequence in group.
+        Objects must implement the DataSet-like `deserialize` method.
+        `klass` is the object class which constructor requires no argument.
+
+        progress_callback: if not None, this function is called with
+        an integer argument (progress: 0 --> 100). Function returns the
+        `cancel` state (True: progress dialog has been canceled, False
+        otherwise)
+        """
+        with self.group(group_name):
+            count = self.read_any()
+            if count is None:
+                # None was saved instead of list of objects
+                return
+            seq = []
+            for index in range(count):
+                if progress_callback is not None:
+                    if progress_callback(int(100 * float(index) / count)):
+                        break
+                seq.append(self.read(str(index), instance=klass()))
+        return seq
+
+    def close(self):
+        """Release the data (the memory-mapped file, if any, is closed when
+        the arrays which were read are not used anymore)"""
+        self.values = {}
+        self.data = None
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                # Arrays are still viewing the file
+                pass
+            self.mmap = None
+
+
+def to_bytes(obj):
+    """Return the binary data of `obj` (object implementing the DataSet-like
+    `serialize` method)"""
+    writer = BinaryWriter()
+    obj.serialize(writer)
+    return writer.getvalue()
+
+
+def from_bytes(data, klass):
+    """Return a new instance of `klass` (class which constructor requires
+    no argument, implementing the DataSet-like `deserialize` method) read
+    from binary `data` (bytes-like object, see `to_bytes`)"""
+    obj = klass()
+    obj.deserialize(BinaryReader(data))
+    return obj
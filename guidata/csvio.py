@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the CECILL License
+# (see guidata/__init__.py for details)
+
+"""
+Reader and Writer for the exchange of DataSet collections as CSV tables
+
+A table has one column per serializable data item (in `_items` order) and
+one row per DataSet instance:
+    * group delimiters and buttons have no column
+    * ObjectItem data items are flattened: the items of the nested data set
+      get "name.subname" columns
+    * None values are written as empty cells: empty strings (and strings
+      starting with a double quote) are written as JSON strings
+
+Rows are read and written by chunks (see `CHUNK_SIZE`), so that the whole
+table never has to fit in memory.
+"""
+
+import csv
+import json
+import datetime
+from itertools import islice
+
+import numpy as np
+
+from guidata.dataset.datatypes import ItemProperty, ObjectItem
+from guidata.dataset.dataitems import (NumericTypeItem, BoolItem, StringItem,
+                                       DateItem, DateTimeItem, ChoiceItem,
+                                       MultipleChoiceItem, FloatArrayItem,
+                                       FilesOpenItem)
+
+
+#: Number of rows read or written at once
+CHUNK_SIZE = 10000
+
+
+def get_csv_columns(klass, prefix=""):
+    """
+    Return the list of the CSV columns of DataSet class `klass`: tuples
+    (column name, items) where items is the list of the data items leading
+    from `klass` to the column item (through ObjectItem data items)
+    """
+    columns = []
+    for item in klass._serializable_items:
+        if isinstance(item, ObjectItem):
+            for name, items in get_csv_columns(item.klass,
+                                               prefix + item._name + "."):
+                columns.append((name, [item] + items))
+        else:
+            columns.append((prefix + item._name, [item]))
+    return columns
+
+
+def _to_json(value):
+    """Encode `value` as JSON text"""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    return json.dumps(value)
+
+
+def _encode_number(value):
+    """Encode number `value` (Python or NumPy scalar)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return repr(value)
+
+
+def _encode_string(value):
+    """Encode string `value` (distinguishing empty strings from None)"""
+    if not value or value.startswith('"'):
+        return json.dumps(value)
+    return value
+
+
+def _decode_string(text):
+    """Decode string encoded with `_encode_string`"""
+    if text.startswith('"'):
+        return json.loads(text)
+    return text
+
+
+def _from_json(text):
+    """Decode JSON text (return `text` itself if it is not valid JSON)"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def get_item_converters(item):
+    """
+    Return the (encode, decode) functions converting the values of data
+    item `item` to CSV text and back (None is always encoded as an empty
+    cell, which is decoded as None)
+    """
+    if isinstance(item, NumericTypeItem):
+        number_type = item.type
+
+        def decode(text):
+            try:
+                return number_type(text)
+            except ValueError:
+                # e.g. "1.0" for an integer item, or an expression
+                return item.from_string(text)
+        return _encode_number, decode
+    elif isinstance(item, BoolItem):
+        return str, lambda text: text.lower() in ("true", "1", "yes")
+    elif isinstance(item, DateTimeItem):
+        return (datetime.datetime.isoformat,
+                datetime.datetime.fromisoformat)
+    elif isinstance(item, DateItem):
+        return datetime.date.isoformat, datetime.date.fromisoformat
+    elif isinstance(item, StringItem) and \
+            not isinstance(item, FilesOpenItem):
+        return _encode_string, _decode_string
+    elif isinstance(item, FloatArrayItem):
+        return _to_json, lambda text: np.array(json.loads(text))
+    elif isinstance(item, ChoiceItem) and \
+            not isinstance(item, MultipleChoiceItem):
+        choices = item.get_prop("data", "choices")
+        if not isinstance(choices, ItemProperty):
+            keys = {str(key): key for key, _label, _image in choices}
+            return str, lambda text: keys.get(text, text)
+    return _to_json, _from_json
+
+
+def _get_value(dataset, items):
+    """Return the value of the (nested) data item at the end of `items`"""
+    value = dataset
+    for item in items:
+        if value is None:
+            return None
+        value = item.get_value(value)
+    return value
+
+
+def _set_value(dataset, items, value):
+    """Set the value of the (nested) data item at the end of `items`"""
+    for item in items[:-1]:
+        dataset = item.get_value(dataset)
+    items[-1].__set__(dataset, value)
+
+
+def write_csv(stream, datasets, klass=None, chunk_size=CHUNK_SIZE,
+              dialect="excel", **fmtparams):
+    """
+    Write `datasets` (iterable of instances of DataSet class `klass`, or
+    DataSetBatch object) to the text `stream` as a CSV table: header line
+    with the column names, then one row per data set
+
+    If `klass` is None, it is the class of the first data set.
+    `dialect` and `fmtparams` are passed to `csv.writer` (e.g. "excel-tab"
+    for tab-separated values).
+    Note that `stream` should be opened with newline="" (see `csv` module).
+    """
+    if klass is None:
+        # DataSetBatch objects know their class
+        klass = getattr(datasets, "klass", None)
+    datasets = iter(datasets)
+    if klass is None:
+        first = next(datasets, None)
+        if first is None:
+            return
+        klass = first.__class__
+        datasets = _chain_first(first, datasets)
+    names, columns = [], []
+    for name, items in get_csv_columns(klass):
+        encode, _decode = get_item_converters(items[-1])
+        names.append(name)
+        columns.append((items, encode))
+    writer = csv.writer(stream, dialect, **fmtparams)
+    writer.writerow(names)
+    while True:
+        chunk = list(islice(datasets, chunk_size))
+        if not chunk:
+            break
+        rows = []
+        for dataset in chunk:
+            row = []
+            for items, encode in columns:
+                value = _get_value(dataset, items)
+                row.append("" if value is None else encode(value))
+            rows.append(row)
+        writer.writerows(rows)
+
+
+def _chain_first(first, iterator):
+    """Yield `first`, then the elements of `iterator`"""
+    yield first
+    yield from iterator
+
+
+def iter_csv(stream, klass, chunk_size=CHUNK_SIZE, dialect="excel",
+             **fmtparams):
+    """
+    Read a CSV table written by `write_csv` from the text `stream` and
+    yield lists of (at most `chunk_size`) new instances of DataSet class
+    `klass`
+
+    Columns are matched by name: the items without column keep their
+    default value and the unknown columns are ignored.
+    `dialect` and `fmtparams` are passed to `csv.reader`.
+    """
+    reader = csv.reader(stream, dialect, **fmtparams)
+    header = next(reader, None)
+    if header is None:
+        return
+    indexes = {name: index for index, name in enumerate(header)}
+    columns = []
+    for name, items in get_csv_columns(klass):
+        if name in indexes:
+            _encode, decode = get_item_converters(items[-1])
+            columns.append((indexes[name], items, decode))
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            break
+        datasets = klass.new_many(len(rows))
+        for index, items, decode in columns:
+            for dataset, row in zip(datasets, rows):
+                text = row[index] if index < len(row) else ""
+                _set_value(dataset, items, decode(text) if text else None)
+        for dataset in datasets:
+            dataset.clear_changes()
+        yield datasets
+
+
+def read_csv(stream, klass, dialect="excel", **fmtparams):
+    """
+    Read a CSV table written by `write_csv` from the text `stream` and
+    return the list of the new instances of DataSet class `klass`
+    (see `iter_csv`)
+    """
+    datasets = []
+    for chunk in iter_csv(stream, klass, dialect=dialect, **fmtparams):
+        datasets.extend(chunk)
+    return datasets
@@ -17,6 +17,9 @@ display and editing with automatically generated graphical user interfaces.
        
 .. automodule:: guidata.dataset.datatypes
    :members:
+
+.. automodule:: guidata.dataset.batch
+   :members:
        
 .. automodule:: guidata.dataset.qtitemwidgets
    :members:
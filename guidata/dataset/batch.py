@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the CECILL License
+# (see guidata/__init__.py for details)
+
+"""
+dataset.batch
+=============
+
+The ``guidata.dataset.batch`` module contains implementation for
+DataSetBatch, a columnar container storing many records of the same
+DataSet class in a NumPy structured array (one field per data item).
+"""
+
+import numpy as np
+
+from guidata.dataset.datatypes import BeginGroup, EndGroup, ObjectItem
+
+
+#: Column types for data items whose `type` attribute maps to a native
+#: NumPy type (other data items are stored in object columns)
+BATCH_DTYPES = {bool: np.bool_, int: np.int64, float: np.float64}
+
+
+def object_column(values, count=None):
+    """Return a 1-D object array built from the `values` iterable,
+    without letting NumPy interpret nested sequences as extra dimensions"""
+    if count is None:
+        values = list(values)
+        count = len(values)
+    return np.fromiter(values, dtype=object, count=count)
+
+
+def get_batch_layout(klass):
+    """Return the (cached) columnar layout of DataSet class `klass`:
+    a tuple (items, dtype) where items is the list of data items stored
+    in the batch (group delimiters are not stored)"""
+    layout = klass.__dict__.get("_batch_layout")
+    if layout is None:
+        items = [item for item in klass._items
+                 if not isinstance(item, (BeginGroup, EndGroup))]
+        fields = []
+        for item in items:
+            dtype = BATCH_DTYPES.get(getattr(item, "type", None))
+            if dtype is None or item._default is None:
+                # None can't be stored in a native column
+                dtype = object
+            fields.append((item._name, dtype))
+        layout = items, np.dtype(fields)
+        setattr(klass, "_batch_layout", layout)
+    return layout
+
+
+def check_column_values(column, name, values):
+    """Raise ValueError if `values` (value or sequence of values) can't be
+    stored as is in the native `column` of data item `name`: None, or
+    values of another kind (e.g. float values in an integer column), which
+    NumPy would silently convert (NaN, False, truncated numbers...)"""
+    if column.dtype == object:
+        return
+    if values is None:
+        has_none = True
+    elif isinstance(values, np.ndarray):
+        has_none = values.dtype == object and \
+            any(value is None for value in values.flat)
+    elif isinstance(values, (list, tuple)):
+        has_none = any(value is None for value in values)
+    else:
+        has_none = False
+    if has_none:
+        raise ValueError("data item %r can't be set to None (native batch "
+                         "column)" % name)
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        values = values.tolist()
+    try:
+        dtype = np.asarray(values).dtype
+    except ValueError:
+        # e.g. ragged sequences
+        dtype = np.dtype(object)
+    if not np.can_cast(dtype, column.dtype, "same_kind"):
+        raise ValueError("data item %r can't be set to %s values (native "
+                         "%s batch column)" % (name, dtype, column.dtype))
+
+
+def _get_item_value(item, dataset):
+    """Return the value of data item `item` for `dataset` (default value if
+    `dataset` is None)"""
+    if dataset is None:
+        if isinstance(item, ObjectItem):
+            return item.create_default()
+        return item._default
+    return item.get_value(dataset)
+
+
+class DataSetRecord(object):
+    """
+    Mixin class for DataSet views on a DataSetBatch record
+
+    Data item values are read from and written to the batch columns
+    instead of the instance attributes.
+    """
+
+    def __getattr__(self, name):
+        # Only called when the attribute was not found the usual way
+        batch = self.__dict__.get("_DataSetRecord__batch")
+        if batch is not None:
+            field = batch._fields.get(name)
+            if field is not None:
+                return batch.get_value(field, self.__index)
+            if name in batch._constants:
+                return batch._constants[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        batch = self.__dict__.get("_DataSetRecord__batch")
+        if batch is not None:
+            field = batch._fields.get(name)
+            if field is not None:
+                column = batch._columns[field]
+                check_column_values(column, field, value)
+                column[self.__index] = value
+                return
+        object.__setattr__(self, name, value)
+
+    def set_defaults(self):
+        """Override DataSet method"""
+        for item in self._items:
+            if isinstance(item, ObjectItem):
+                # No lazy default value in batch columns
+                item.__set__(self, item.create_default())
+            else:
+                item.set_default(self)
+
+    def copy(self, deep=False):
+        """Override DataSet method: return a regular DataSet instance"""
+        batch = self.__batch
+        dataset = batch.klass()
+        for item in batch.items:
+            setattr(dataset, item._storage, getattr(self, item._storage))
+        clone = dataset.copy(deep)
+        if not deep:
+            # Share the read-only views of the arrays with the batch too
+            for item in batch.items:
+                value = getattr(dataset, item._storage)
+                if isinstance(value, np.ndarray):
+                    setattr(self, item._storage, value)
+        return clone
+
+    def get_record_index(self):
+        """Return the index of this record in its batch"""
+        return self.__index
+
+
+def get_record_class(klass):
+    """Return the (cached) DataSet view class of DataSet class `klass`"""
+    view_class = klass.__dict__.get("_record_class")
+    if view_class is None:
+        view_class = type(klass)(klass.__name__, (DataSetRecord, klass),
+                                 {"__doc__": klass.__doc__,
+                                  "__module__": klass.__module__,
+                                  "compact": False})
+        setattr(klass, "_record_class", view_class)
+    return view_class
+
+
+class DataSetBatch(object):
+    """
+    Construct a DataSetBatch object, storing `size` records of the DataSet
+    class `klass` as NumPy columns (struct-of-arrays)
+        * klass [DataSet class]
+        * size [int]: number of records (initialized to item defaults)
+        * data [numpy structured array]: existing storage (optional,
+          `size` is then ignored)
+
+    Boolean, integer and float items with a default value are stored in
+    native columns (their value can't be set to None: ValueError is
+    raised), other items in object columns.
+
+    Indexing:
+        * batch[i] returns a DataSet view on record i (reads and writes
+          go through the batch columns)
+        * batch[i:j], batch[mask] return a DataSetBatch (slices share the
+          same storage)
+        * batch['name'] returns the column of data item `name`
+        * batch['name'] = values (bulk assignment)
+        * batch[i] = dataset copies the values of `dataset` in record i
+    """
+
+    def __init__(self, klass, size=0, data=None):
+        self.klass = klass
+        self.items, dtype = get_batch_layout(klass)
+        if data is None:
+            data = np.zeros(size, dtype=dtype)
+            self.__set_storage(data)
+            self.set_defaults()
+        else:
+            self.__set_storage(data)
+
+    def __set_storage(self, data):
+        self.data = data
+        self._columns = {}
+        self._fields = {}
+        for item in self.items:
+            self._columns[item._name] = data[item._name]
+            self._fields[item._storage] = item._name
+        # Group delimiters are not stored: they keep their default value
+        self._constants = {item._storage: item._default
+                           for item in self.klass._items
+                           if item._name not in self._columns}
+
+    def set_defaults(self):
+        """Set all records to default values"""
+        defaults = self.klass._defaults
+        for item in self.items:
+            if isinstance(item, ObjectItem):
+                # Default objects are created now: batch columns are
+                # passed outside of the data sets (no lazy default value)
+                self[item._name] = [item.create_default()
+                                    for _index in range(len(self))]
+            elif item._storage in defaults:
+                self.fill(item._name, defaults[item._storage])
+        custom_items = [item for item in self.klass._custom_default_items
+                        if not isinstance(item, ObjectItem)]
+        if custom_items:
+            # Items with their own default policy
+            for record in self:
+                for item in custom_items:
+                    item.set_default(record)
+
+    @classmethod
+    def from_datasets(cls, klass, datasets):
+        """Create a batch from a sequence of DataSet instances"""
+        datasets = list(datasets)
+        batch = cls(klass, data=np.zeros(len(datasets),
+                                         dtype=get_batch_layout(klass)[1]))
+        for item in batch.items:
+            values = [_get_item_value(item, dataset) for dataset in datasets]
+            batch[item._name] = values
+        return batch
+
+    def to_datasets(self):
+        """Return a list of DataSet instances holding the record values
+        (values are not copied)"""
+        datasets = []
+        for index in range(len(self)):
+            dataset = self.klass()
+            for item in self.items:
+                setattr(dataset, item._storage,
+                        self.get_value(item._name, index))
+            datasets.append(dataset)
+        return datasets
+
+    def get_value(self, name, index):
+        """Return value of data item `name` for record `index`"""
+        value = self._columns[name][index]
+        if isinstance(value, np.generic):
+            # Native column: return a Python scalar
+            return value.item()
+        return value
+
+    def fill(self, name, value):
+        """Set data item `name` to `value` for all records"""
+        column = self._columns[name]
+        check_column_values(column, name, value)
+        if column.dtype == object:
+            column.fill(value)
+        else:
+            column[...] = value
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._columns[key]
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("record index out of range")
+            return self._get_record(index)
+        return self.__class__(self.klass, data=self.data[key])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, str):
+            column = self._columns[key]
+            if column.dtype == object and not isinstance(value, np.ndarray):
+                value = object_column(value, count=len(column))
+            check_column_values(column, key, value)
+            column[...] = value
+        elif isinstance(key, (int, np.integer)):
+            values = [_get_item_value(item, value) for item in self.items]
+            for item, item_value in zip(self.items, values):
+                check_column_values(self._columns[item._name], item._name,
+                                    item_value)
+            for item, item_value in zip(self.items, values):
+                self._columns[item._name][key] = item_value
+        else:
+            raise TypeError("invalid batch key %r" % (key, ))
+
+    def _get_record(self, index):
+        record = object.__new__(get_record_class(self.klass))
+        record.__dict__["_DataSetRecord__batch"] = self
+        record.__dict__["_DataSetRecord__index"] = index
+        title, comment = record._compute_title_and_comment()
+        record._DataSet__title = title
+        record._DataSet__comment = comment
+        record._DataSet__icon = ''
+        record._DataSet__changed = 0
+        record._DataSet__version = 0
+        record._DataSet__props = {} if self.klass.cache_props else None
+        return record
+
+    def __str__(self):
+        return "%s(%s, %d records)" % (self.__class__.__name__,
+                                       self.klass.__name__, len(self))
@@ -13,13 +13,15 @@ The ``guidata.dataset.dataitems`` module contains implementation for
 concrete DataItems.
 """
 
-import os
-import re
 import datetime
 import collections
 
+import numpy as np
+
 from guidata.dataset.datatypes import DataItem, ItemProperty
-from guidata.utils import add_extension
+from guidata.dataset.batch import object_column
+from guidata.utils import (add_extension, get_path_kind, get_path_kinds,
+                           evaluate_expression)
 from guidata.config import _
 
 
@@ -28,6 +30,8 @@ class NumericTypeItem(DataItem):
     Numeric data item
     """
     type = None
+    # NumPy dtype kinds of native arrays accepted by `check_batch`
+    _batch_kinds = {int: "biu", float: "f"}
 
     def __init__(self, label, default=None, min=None, max=None,
                  nonzero=None, unit='', help='', check=True):
@@ -83,16 +87,69 @@ class NumericTypeItem(DataItem):
                 return False
         return True
 
+    def check_batch(self, values):
+        """Override DataItem method"""
+        if type(self).check_value is not NumericTypeItem.check_value:
+            return DataItem.check_batch(self, values)
+        if not self.get_prop('data', 'check_value', True):
+            return np.ones(len(values), dtype=bool)
+        valid, _numbers = self._check_numeric_batch(values)
+        return valid
+
+    def _check_numeric_batch(self, values):
+        """Vectorized version of the `check_value` numeric checks:
+        return (valid, numbers) where `numbers` is a native array"""
+        if not isinstance(values, np.ndarray):
+            # Keep Python types (NumPy would e.g. upcast ints to floats)
+            values = object_column(values)
+        if values.dtype == object:
+            valid = np.fromiter((isinstance(value, self.type)
+                                 for value in values),
+                                dtype=bool, count=len(values))
+            numbers = np.zeros(len(values), dtype=self.type)
+            numbers[valid] = values[valid]
+        elif values.dtype.kind in self._batch_kinds[self.type]:
+            valid = np.ones(len(values), dtype=bool)
+            numbers = values
+        else:
+            return np.zeros(len(values), dtype=bool), values
+        if self.get_prop("data", "nonzero"):
+            valid &= numbers != 0
+        _min = self.get_prop("data", "min")
+        if _min is not None:
+            valid &= ~(numbers < _min)
+        _max = self.get_prop("data", "max")
+        if _max is not None:
+            valid &= ~(numbers > _max)
+        return valid, numbers
+
     def from_string(self, value):
         """Override DataItem method"""
         value = str(value)  # necessary if value is a QString
         # String may contains numerical operands:
-        if re.match(r'^([\d\(\)\+/\-\*.]|e)+$', value):
+        try:
+            return self.type(evaluate_expression(value))
+        except (ValueError, TypeError, ArithmeticError):
+            return None
+
+    def from_strings(self, values):
+        """
+        Transform a sequence of strings into a NumPy masked array of
+        data item's values (see `from_string`): invalid strings are masked
+        """
+        numbers = np.zeros(len(values), dtype=self.type)
+        mask = np.zeros(len(values), dtype=bool)
+        for index, value in enumerate(values):
+            number = self.from_string(value)
+            if number is None:
+                mask[index] = True
+                continue
             try:
-                return self.type(eval(value))
-            except:
-                pass
-        return None
+                numbers[index] = number
+            except OverflowError:
+                # Out of the range of the array dtype
+                mask[index] = True
+        return np.ma.MaskedArray(numbers, mask=mask)
 
 
 class FloatItem(NumericTypeItem):
@@ -175,6 +232,18 @@ class IntItem(NumericTypeItem):
                 return False
         return True
 
+    def check_batch(self, values):
+        """Override DataItem method"""
+        if type(self).check_value is not IntItem.check_value:
+            return DataItem.check_batch(self, values)
+        if not self.get_prop('data', 'check_value', True):
+            return np.ones(len(values), dtype=bool)
+        valid, numbers = self._check_numeric_batch(values)
+        even = self.get_prop("data", "even")
+        if even is not None and valid.any():
+            valid &= (numbers % 2 == 0) == bool(even)
+        return valid
+
     def get_value_from_reader(self, reader):
         """Reads value from the reader object, inside the try...except
         statement defined in the base item `deserialize` method"""
@@ -205,6 +274,17 @@ class StringItem(DataItem):
             return False
         return True
 
+    def check_batch(self, values):
+        """Override DataItem method"""
+        if type(self).check_value is not StringItem.check_value:
+            return DataItem.check_batch(self, values)
+        if not self.get_prop("data", "notempty"):
+            return np.ones(len(values), dtype=bool)
+        if isinstance(values, np.ndarray) and values.dtype.kind in "US":
+            return np.char.str_len(values) > 0
+        return np.fromiter((bool(value) for value in values),
+                           dtype=bool, count=len(values))
+
     def from_string(self, value):
         """Override DataItem method"""
         # QString -> str
@@ -297,6 +377,20 @@ class ColorItem(StringItem):
         return reader.read_any()
 
 
+def _check_paths_batch(item, values, kind):
+    """Return a boolean array which is True where the path of the `values`
+    sequence exists and is of the `kind` (see `guidata.utils.get_path_kind`)
+    for path data item `item`"""
+    if not item.get_prop('data', 'check_value', True):
+        return np.ones(len(values), dtype=bool)
+    valid = np.zeros(len(values), dtype=bool)
+    indexes = [index for index, value in enumerate(values)
+               if isinstance(value, item.type)]
+    kinds = get_path_kinds([values[index] for index in indexes])
+    valid[indexes] = [path_kind == kind for path_kind in kinds]
+    return valid
+
+
 class FileSaveItem(StringItem):
     """
     Construct a path data item for a file to be saved
@@ -353,7 +447,13 @@ class FileOpenItem(FileSaveItem):
             return True
         if not isinstance(value, self.type):
             return False
-        return os.path.exists(value) and os.path.isfile(value)
+        return get_path_kind(value) == "file"
+
+    def check_batch(self, values):
+        """Override DataItem method: paths are checked concurrently"""
+        if type(self).check_value is not FileOpenItem.check_value:
+            return DataItem.check_batch(self, values)
+        return _check_paths_batch(self, values, "file")
 
 
 class FilesOpenItem(FileSaveItem):
@@ -382,7 +482,21 @@ class FilesOpenItem(FileSaveItem):
             return True
         if value is None:
             return False
-        return all(os.path.exists(p) and os.path.isfile(p) for p in value)
+        return all(kind == "file" for kind in get_path_kinds(value))
+
+    def check_batch(self, values):
+        """Override DataItem method: paths are checked concurrently"""
+        if type(self).check_value is not FilesOpenItem.check_value:
+            return DataItem.check_batch(self, values)
+        if not self.get_prop('data', 'check_value', True):
+            return np.ones(len(values), dtype=bool)
+        paths = [path for value in values if value is not None
+                 for path in value]
+        kinds = dict(zip(paths, get_path_kinds(paths)))
+        return np.fromiter((value is not None and
+                            all(kinds[path] == "file" for path in value)
+                            for value in values),
+                           dtype=bool, count=len(values))
 
     def from_string(self, value):
         """Override DataItem method"""
@@ -398,8 +512,8 @@ class FilesOpenItem(FileSaveItem):
     def get_value_from_reader(self, reader):
         """Reads value from the reader object, inside the try...except
         statement defined in the base item `deserialize` method"""
-        return [str(fname)
-                for fname in reader.read_sequence()]
+        return [fname.decode("utf-8") if isinstance(fname, bytes)
+                else str(fname) for fname in reader.read_sequence()]
 
 
 class DirectoryItem(StringItem):
@@ -417,7 +531,13 @@ class DirectoryItem(StringItem):
             return True
         if not isinstance(value, self.type):
             return False
-        return os.path.exists(value) and os.path.isdir(value)
+        return get_path_kind(value) == "dir"
+
+    def check_batch(self, values):
+        """Override DataItem method: paths are checked concurrently"""
+        if type(self).check_value is not DirectoryItem.check_value:
+            return DataItem.check_batch(self, values)
+        return _check_paths_batch(self, values, "dir")
 
 
 class FirstChoice(object):
@@ -632,6 +752,7 @@ class ButtonItem(DataItem):
     The value of this item is unspecified but is passed to the callback along
     with the whole dataset. The value is assigned the callback`s return value.
     """
+    _serializable = False
 
     def __init__(self, label, callback, icon=None, default=None, help='',
                  check=True):
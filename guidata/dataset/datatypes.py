@@ -17,8 +17,12 @@ ValueProp, ...).
 # pylint: disable-msg=W0622
 # pylint: disable-msg=W0212
 
+import io
+import hashlib
+import math
 import sys
 import re
+import copy
 import collections
 
 from guidata.utils import update_dataset
@@ -32,6 +36,9 @@ class NoDefault:
 
 
 class ItemProperty(object):
+    # False if the property value can't be memoized by DataSets having
+    # the `cache_props` option enabled
+    cacheable = True
 
     def __init__(self, callable=None):
         self.callable = callable
@@ -48,6 +55,11 @@ class ItemProperty(object):
         """
         raise NotImplementedError
 
+    def get_dependencies(self, item):
+        """Return the set of instance attribute names read by the property
+        when evaluated for `item`, or None if they are unknown"""
+        return None
+
 
 FMT_GROUPS = re.compile(r"(?<!%)%\((\w+)\)")
 
@@ -65,6 +77,11 @@ class FormatProp(ItemProperty):
         self.ignore_error = ignore_error
         self.attrs = FMT_GROUPS.findall(fmt)
 
+    def get_dependencies(self, item):
+        if not self.attrs:
+            return {item._name}
+        return set(self.attrs)
+
     def __call__(self, instance, item, value):
         if not self.attrs:
             return self.fmt % value
@@ -87,20 +104,29 @@ class GetAttrProp(ItemProperty):
     def __init__(self, attr):
         self.attr = attr
 
+    def get_dependencies(self, item):
+        return {self.attr}
+
     def __call__(self, instance, item, value):
         return getattr(instance, self.attr)
 
     def set(self, instance, item, value):
         setattr(instance, self.attr, value)
+        if getattr(instance, "cache_props", False):
+            instance.invalidate_props()
 
 
 class ValueProp(ItemProperty):
     """A property that retrieves a value stored elsewhere
     """
+    cacheable = False  # value may be changed without notifying instances
 
     def __init__(self, value):
         self.value = value
 
+    def get_dependencies(self, item):
+        return set()
+
     def __call__(self, instance, item, value):
         return self.value
 
@@ -114,6 +140,13 @@ class NotProp(ItemProperty):
     def __init__(self, prop):
         self.property = prop
 
+    @property
+    def cacheable(self):
+        return self.property.cacheable
+
+    def get_dependencies(self, item):
+        return self.property.get_dependencies(item)
+
     def __call__(self, instance, item, value):
         return not self.property(instance, item, value)
 
@@ -135,6 +168,13 @@ class FuncProp(ItemProperty):
             invfunc = func
         self.inverse_function = invfunc
 
+    @property
+    def cacheable(self):
+        return self.property.cacheable
+
+    def get_dependencies(self, item):
+        return self.property.get_dependencies(item)
+
     def __call__(self, instance, item, value):
         return self.function(self.property(instance, item, value))
 
@@ -151,11 +191,23 @@ class DataItem(object):
     `help` : string Text displayed on data item's tooltip
     """
     count = 0
+    props_generation = 0  # incremented each time a property is set
+    # False for items which are not (de)serialized, i.e. whose `serialize`
+    # method is a no-op (see `__init_subclass__`)
+    _serializable = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "serialize" in cls.__dict__ \
+                and "_serializable" not in cls.__dict__:
+            # `serialize` is overridden: it is not the no-op anymore
+            cls._serializable = True
 
     def __init__(self, label, default=None, help='', check=True):
         self._order = DataItem.count
         DataItem.count += 1
         self._name = None
+        self._storage = None  # name of the instance attribute storing value
         self._default = default
         self._help = str(help)
         self._props = {}  # a dict realm->dict containing realm-specific properties
@@ -175,6 +227,9 @@ class DataItem(object):
     def get_prop_value(self, realm, instance, name, default=NoDefault):
         value = self.get_prop(realm, name, default)
         if isinstance(value, ItemProperty):
+            if value.cacheable and getattr(instance, "cache_props", False):
+                return instance.get_cached_prop_value(self, realm, name,
+                                                      value)
             return value(instance, self, self.get_value(instance))
         else:
             return value
@@ -192,8 +247,24 @@ class DataItem(object):
             prop = {}
             self._props[realm] = prop
         prop.update(kwargs)
+        DataItem.props_generation += 1
         return self
 
+    def get_dependencies(self):
+        """
+        Return the set of instance attribute names read by the item
+        properties, or None if some of them are unknown
+        """
+        dependencies = set()
+        for prop in self._props.values():
+            for value in prop.values():
+                if isinstance(value, ItemProperty):
+                    names = value.get_dependencies(self)
+                    if names is None:
+                        return None
+                    dependencies.update(names)
+        return dependencies
+
     def set_pos(self, col=0, colspan=None):
         """
         Set data item's position on a GUI layout
@@ -253,6 +324,7 @@ class DataItem(object):
         Set data item's name
         """
         self._name = new_name
+        self._storage = "_" + new_name
 
     def set_from_string(self, instance, string_value):
         """
@@ -283,11 +355,12 @@ class DataItem(object):
         func(self)
 
     def __set__(self, instance, value):
-        setattr(instance, "_" + self._name, value)
+        setattr(instance, self._storage, value)
+        instance.set_changed(self._name)
 
     def __get__(self, instance, klass):
         if instance is not None:
-            return getattr(instance, "_" + self._name, self._default)
+            return getattr(instance, self._storage, self._default)
         else:
             return self
 
@@ -301,7 +374,7 @@ class DataItem(object):
         """
         Check data item's current value (calling method check_value)
         """
-        value = getattr(instance, "_" + self._name)
+        value = getattr(instance, self._storage)
         return self.check_value(value)
 
     def check_value(self, instance, value):
@@ -310,6 +383,33 @@ class DataItem(object):
         """
         raise NotImplementedError()
 
+    async def check_item_async(self, instance, executor=None):
+        """
+        Coroutine checking data item's current value: await method
+        `check_value_async` (coroutine) if the child class defines it,
+        otherwise run `check_item` in `executor` (None: default executor
+        of the event loop)
+        """
+        import asyncio
+        check_value_async = getattr(self, "check_value_async", None)
+        if check_value_async is not None:
+            return await check_value_async(getattr(instance, self._storage))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.check_item, instance)
+
+    def check_batch(self, values):
+        """
+        Check a 1-D array of values for this data item: return a boolean
+        array which is True where the value is valid
+
+        This default implementation calls `check_value` for each value
+        and is reimplemented with vectorized checks in some child classes
+        """
+        import numpy as np
+        return np.fromiter((bool(self.check_value(value))
+                            for value in values),
+                           dtype=bool, count=len(values))
+
     def from_string(self, instance, string_value):
         """
         Transform string into valid data item's value
@@ -347,12 +447,7 @@ class DataItem(object):
         try:
             value = self.get_value_from_reader(reader)
         except RuntimeError as e:
-            if DEBUG_DESERIALIZE:
-                import traceback
-                print("DEBUG_DESERIALIZE enabled in datatypes.py",
-                      file=sys.stderr)
-                traceback.print_stack()
-                print(e, file=sys.stderr)
+            _debug_deserialize(e)
             self.set_default(instance)
             return None
         self.__set__(instance, value)
@@ -366,18 +461,67 @@ class Obj(object):
         self.__dict__.update(kwargs)
 
 
+class _LazyDefault(object):
+    """Placeholder stored instead of an ObjectItem value until the nested
+    data set is accessed for the first time"""
+    __slots__ = ()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Unpickled as the `_LAZY_DEFAULT` singleton
+        return "_LAZY_DEFAULT"
+
+    def __repr__(self):
+        return "<lazy default>"
+
+_LAZY_DEFAULT = _LazyDefault()
+
+
 class ObjectItem(DataItem):
     """Simple helper class implementing default
-    for composite objects"""
+    for composite objects
+
+    The default object is created on first access (see `create_default`)"""
     klass = None
 
-    def set_default(self, instance):
-        """Make a copy of the default value
-        """
+    def create_default(self):
+        """Return a new object initialized to the default value"""
         value = self.klass()
         if self._default is not None:
             update_dataset(value, self._default)
-        self.__set__(instance, value)
+            value.clear_changes()
+        return value
+
+    def set_default(self, instance):
+        """Make a copy of the default value (lazily, see `__get__`)
+        """
+        setattr(instance, self._storage, _LAZY_DEFAULT)
+        instance.set_changed(self._name)
+
+    def __get__(self, instance, klass):
+        if instance is None:
+            return self
+        value = getattr(instance, self._storage, self._default)
+        if value is _LAZY_DEFAULT:
+            value = self.create_default()
+            setattr(instance, self._storage, value)
+        return value
+
+    def check_item(self, instance):
+        """Re-implement DataItem method: the default object is created
+        first, if needed (see `__get__`)"""
+        self.get_value(instance)
+        return DataItem.check_item(self, instance)
+
+    def check_item_async(self, instance, executor=None):
+        """Re-implement DataItem method (see `check_item`)"""
+        self.get_value(instance)
+        return DataItem.check_item_async(self, instance, executor)
 
     def deserialize(self, instance, reader):
         """Deserialize this item using the reader object
@@ -439,6 +583,14 @@ class DataItemProxy(object):
         """DataItem method proxy"""
         return self.item.check_value(instance, value)
 
+    def check_item_async(self, instance, executor=None):
+        """DataItem method proxy"""
+        return self.item.check_item_async(instance, executor)
+
+    def check_batch(self, values):
+        """DataItem method proxy"""
+        return self.item.check_batch(values)
+
     def from_string(self, instance, string_value):
         """DataItem method proxy"""
         return self.item.from_string(instance, string_value)
@@ -523,6 +675,10 @@ class DataItemVariable(object):
         """Re-implement DataItem method"""
         return self.item.check_value(value)
 
+    def check_batch(self, values):
+        """Re-implement DataItem method"""
+        return self.item.check_batch(values)
+
     def from_string(self, string_value):
         """Re-implement DataItem method"""
         return self.item.from_string(string_value)
@@ -532,12 +688,214 @@ class DataItemVariable(object):
         return self.item.get_prop("display", "label")
 
 
+def build_dependency_graph(items):
+    """
+    Return the dependency graph of the properties of `items`: a dictionary
+    mapping each instance attribute name to the list of items whose
+    properties read it. Items with properties of unknown dependencies
+    (e.g. ItemProperty built on arbitrary callables) are listed under
+    the `None` key.
+    """
+    graph = {None: []}
+    for item in items:
+        names = item.get_dependencies()
+        if names is None:
+            graph[None].append(item)
+            continue
+        for name in names:
+            graph.setdefault(name, []).append(item)
+    return graph
+
+
+def _read_only_view(array):
+    """Return a read-only view of NumPy `array` (or `array` itself if it
+    is already read-only)"""
+    if not array.flags.writeable:
+        return array
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _update_fingerprint(hasher, value):
+    """Feed `value` to the `hasher` object (see `DataSet.fingerprint`)"""
+    import numpy as np
+    update = hasher.update
+    if isinstance(value, DataSet):
+        value._update_fingerprint(hasher)
+    elif isinstance(value, np.ndarray):
+        if not value.dtype.isnative:
+            # Equal arrays get the same fingerprint whatever their byte
+            # order
+            value = value.astype(value.dtype.newbyteorder("="))
+        update(("ndarray:%s:%r:" % (value.dtype.str, value.shape)).encode())
+        if value.dtype.hasobject:
+            for element in value.flat:
+                _update_fingerprint(hasher, element)
+        elif value.flags.c_contiguous:
+            update(value.reshape(-1).view(np.uint8))
+        elif value.size:
+            # Hash the array data chunk by chunk (bounded buffer)
+            for chunk in np.nditer(value, flags=["external_loop", "buffered",
+                                                 "zerosize_ok"], order="C"):
+                update(chunk.view(np.uint8))
+    elif isinstance(value, (list, tuple)):
+        update(("%s:%d:" % (type(value).__name__, len(value))).encode())
+        for element in value:
+            _update_fingerprint(hasher, element)
+    elif isinstance(value, dict):
+        update(("dict:%d:" % len(value)).encode())
+        for key in sorted(value, key=repr):
+            _update_fingerprint(hasher, key)
+            _update_fingerprint(hasher, value[key])
+    else:
+        if isinstance(value, np.generic):
+            value = value.item()
+        update(("%s:%r;" % (type(value).__name__, value)).encode())
+
+
+def _values_differ(value1, value2, rtol=0., atol=0.):
+    """Return True if item values `value1` and `value2` are different
+    (arrays and floats are compared with tolerance `rtol`, `atol`, NaN
+    values are equal, lists, tuples and dictionaries are compared element
+    by element)"""
+    import numpy as np
+    if value1 is value2:
+        return False
+    if isinstance(value1, np.ndarray) or isinstance(value2, np.ndarray):
+        if not (isinstance(value1, np.ndarray)
+                and isinstance(value2, np.ndarray)):
+            return True
+        if value1.shape != value2.shape:
+            return True
+        if value1.dtype.hasobject or value2.dtype.hasobject:
+            return any(_values_differ(element1, element2, rtol, atol)
+                       for element1, element2 in zip(value1.flat,
+                                                     value2.flat))
+        if value1.dtype.kind in "fc" and value2.dtype.kind in "fc":
+            if rtol or atol:
+                return not np.allclose(value1, value2, rtol=rtol, atol=atol,
+                                       equal_nan=True)
+            return not np.array_equal(value1, value2, equal_nan=True)
+        return not np.array_equal(value1, value2)
+    if isinstance(value1, float) and isinstance(value2, float):
+        if math.isnan(value1) or math.isnan(value2):
+            return not (math.isnan(value1) and math.isnan(value2))
+        if rtol or atol:
+            return not abs(value1 - value2) <= atol + rtol * abs(value2)
+    if isinstance(value1, (list, tuple)) and \
+       isinstance(value2, (list, tuple)):
+        if type(value1) is not type(value2) or len(value1) != len(value2):
+            return True
+        return any(_values_differ(element1, element2, rtol, atol)
+                   for element1, element2 in zip(value1, value2))
+    if isinstance(value1, dict) and isinstance(value2, dict):
+        if value1.keys() != value2.keys():
+            return True
+        return any(_values_differ(value1[key], value2[key], rtol, atol)
+                   for key in value1)
+    try:
+        return bool(value1 != value2)
+    except (TypeError, ValueError):
+        # e.g. objects holding arrays (ambiguous truth value)
+        return True
+
+
+def _debug_deserialize(error):
+    """Print deserialization `error` if DEBUG_DESERIALIZE is enabled"""
+    if DEBUG_DESERIALIZE:
+        import traceback
+        print("DEBUG_DESERIALIZE enabled in datatypes.py", file=sys.stderr)
+        traceback.print_stack()
+        print(error, file=sys.stderr)
+
+
+class DataSetCodec(object):
+    """
+    Serialization codec of a DataSet class (see `DataSet.use_codec`)
+
+    The codec holds the ordered list of the serializable items with the
+    storage attribute of the items which are written and read directly
+    (without calling their `serialize` and `deserialize` methods), and
+    enters item groups with `begin`/`end` instead of context managers.
+    The written data is the same as with the DataSet methods.
+    """
+
+    def __init__(self, klass):
+        self.klass = klass
+        self.items = []
+        for item in klass._serializable_items:
+            item_type = type(item)
+            default_access = item_type.__get__ is DataItem.__get__ and \
+                item_type.__set__ is DataItem.__set__
+            write_storage = read_storage = None
+            if default_access and item_type.serialize is DataItem.serialize:
+                write_storage = item._storage
+            if default_access and \
+               item_type.deserialize is DataItem.deserialize:
+                read_storage = item._storage
+            self.items.append((item._name, item, write_storage,
+                               read_storage))
+
+    def serialize(self, instance, writer, names=None):
+        """Serialize the items of `instance` (or only the items `names`)
+        using the writer object"""
+        begin, end, write = writer.begin, writer.end, writer.write
+        for name, item, storage, _read_storage in self.items:
+            if names is not None and name not in names:
+                continue
+            begin(name)
+            if storage is None:
+                item.serialize(instance, writer)
+            else:
+                write(getattr(instance, storage, item._default))
+            end(name)
+
+    def deserialize(self, instance, reader):
+        """Deserialize the items of `instance` using the reader object"""
+        begin, end = reader.begin, reader.end
+        set_changed = instance.set_changed
+        for name, item, _write_storage, storage in self.items:
+            begin(name)
+            try:
+                if storage is None:
+                    item.deserialize(instance, reader)
+                else:
+                    # Same as DataItem.deserialize
+                    value = item.get_value_from_reader(reader)
+                    setattr(instance, storage, value)
+                    set_changed(name)
+            except RuntimeError as error:
+                _debug_deserialize(error)
+                item.set_default(instance)
+            end(name)
+
+
+# Name-mangled attributes of the DataSet metadata (stored in slots by compact
+# DataSet classes, see `DataSetMeta`)
+_METADATA_ATTRS = ("_DataSet__title", "_DataSet__comment", "_DataSet__icon",
+                   "_DataSet__changed", "_DataSet__version",
+                   "_DataSet__props")
+
+
 class DataSetMeta(type):
     """
     DataSet metaclass
 
     Create class attribute `_items`: list of the DataSet class attributes,
     created in the same order as these attributes were written
+
+    Also create the tables used to initialize and serialize instances:
+    `_defaults` (default value of each storage attribute),
+    `_custom_default_items` (items with their own `set_default` method),
+    `_serializable_items`, `_data_items` (items holding a value: all items
+    but group delimiters), `_item_bits` (bit of each item in the changed
+    items bitmask) and the dependency graph of item properties
+    (see `DataSet.get_dependency_graph`)
+
+    When the class attribute `compact` is True (it is inherited by child
+    classes), item values and data set metadata (title, comment, ...) are
+    stored in generated `__slots__` instead of the instance `__dict__`
     """
     def __new__(cls, name, bases, dct):
         items = {}
@@ -555,10 +913,63 @@ class DataSetMeta(type):
         items_list = list(items.values())
         items_list.sort(key=lambda x: x._order)
         dct["_items"] = items_list
-        return type.__new__(cls, name, bases, dct)
-
-
-Meta_Py3Compat = DataSetMeta('Meta_Py3Compat', (object, ), {})
+        # Per-class tables used by the DataSet instances
+        defaults = {}
+        custom_default_items = []
+        for item in items_list:
+            if type(item).set_default is DataItem.set_default and \
+               type(item).__set__ is DataItem.__set__:
+                defaults[item._storage] = item._default
+            elif type(item).set_default is ObjectItem.set_default:
+                # Nested data sets are created on first access
+                defaults[item._storage] = _LAZY_DEFAULT
+            else:
+                custom_default_items.append(item)
+        dct["_defaults"] = defaults
+        dct["_custom_default_items"] = custom_default_items
+        dct["_serializable_items"] = [item for item in items_list
+                                      if item._serializable]
+        dct["_data_items"] = [item for item in items_list
+                              if not isinstance(item, (BeginGroup, EndGroup))]
+        dct["_item_bits"] = {item._name: 1 << index
+                             for index, item in enumerate(items_list)}
+        compact = dct.get("compact", any(getattr(base, "compact", False)
+                                         for base in bases))
+        if compact and "__slots__" not in dct:
+            slots = set()
+            for base in bases:
+                for klass in base.__mro__:
+                    slots.update(klass.__dict__.get("__slots__", ()))
+            attrs = [item._storage for item in items_list]
+            attrs.extend(_METADATA_ATTRS)
+            dct["__slots__"] = tuple(attr for attr in attrs
+                                     if attr not in slots)
+        klass = type.__new__(cls, name, bases, dct)
+        # Instances of compact classes inherit the `__dict__` of DataSet but
+        # never allocate it (all their attributes are stored in slots)
+        klass._has_dict = klass.__dictoffset__ != 0 and not compact
+        # Attribute names of the slots (see `DataSet.__getstate__`)
+        klass._slot_names = tuple(
+            _mangle_slot_name(base, slot) for base in klass.__mro__
+            for slot in base.__dict__.get("__slots__", ())
+            if slot not in ("__dict__", "__weakref__"))
+        # Item values are stored in the instance __dict__ (not in slots)
+        klass._dict_storage = klass._has_dict and not klass._slot_names
+        klass._dependencies = (DataItem.props_generation,
+                               build_dependency_graph(items_list))
+        klass._codec = DataSetCodec(klass) \
+            if getattr(klass, "use_codec", False) else None
+        return klass
+
+
+def _mangle_slot_name(klass, name):
+    """Return the attribute name of slot `name` of class `klass`"""
+    if name.startswith("__") and not name.endswith("__"):
+        return "_%s%s" % (klass.__name__.lstrip("_"), name)
+    return name
+
+
+Meta_Py3Compat = DataSetMeta('Meta_Py3Compat', (object, ), {"__slots__": ()})
 
 
 class DataSet(Meta_Py3Compat):
@@ -568,17 +979,75 @@ class DataSet(Meta_Py3Compat):
         * comment [string]: text shown on the top of the first data item
         * icon [QIcon or string]: icon show on the button (optional)
           (string: icon filename as in guidata/guiqwt image search paths)
+
+    Child classes may set the class attribute `compact` to True to store
+    item values and metadata in `__slots__` (saving memory when many
+    instances are kept alive, but other instance attributes are neither
+    copied nor pickled anymore)
+
+    Child classes may set the class attribute `cache_props` to True to
+    memoize the evaluation of item properties (FormatProp, GetAttrProp, ...)
+    until the next item value change. Properties depending on something
+    else than item values require a call to `invalidate_props`.
+
+    Child classes may set the class attribute `use_codec` to True to
+    serialize and deserialize instances with a codec generated with the
+    class (faster, see `DataSetCodec`)
+
+    Data sets are compared by value (see `diff`), hence they are not
+    hashable anymore: they can't be used as dictionary keys or set elements
+    (use `fingerprint` to get a key of their current values, or
+    `id(dataset)` to key them by identity)
     """
     __metaclass__ = DataSetMeta  # keep it even with Python 3 (see DataSetMeta)
+    compact = False
+    cache_props = False
+    use_codec = False
 
     def __init__(self, title=None, comment=None, icon=''):
         self.__icon = icon
         comp_title, comp_comment = self._compute_title_and_comment()
         self.__title = title if title is not None else comp_title
         self.__comment = comp_comment if comment is not None else comment
-        self.__changed = False
+        self.__changed = 0  # bitmask of changed items (see `_item_bits`)
+        self.__version = 0
+        self.__props = {} if self.cache_props else None
         # Set default values
         self.set_defaults()
+        self.__changed = 0
+
+    def __getstate__(self):
+        """
+        Return the instance state (pickling and copying): dictionary of the
+        attribute values, whether they are stored in slots or not
+        """
+        state = dict(self.__dict__) if self._has_dict else {}
+        for name in self._slot_names:
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                # Unset slot
+                pass
+        # The item properties cache is rebuilt on demand
+        state.pop("_DataSet__props", None)
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore the instance state (see `__getstate__`), including the
+        state of instances pickled by older versions
+        """
+        if isinstance(state, tuple):
+            # Default state of instances with slots: (dict, slots dict)
+            dict_state, slots_state = state
+            state = dict(dict_state or {}, **(slots_state or {}))
+        self.__changed = 0
+        self.__version = 0
+        self.__props = {} if self.cache_props else None
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        # Older versions stored a boolean
+        self.__changed = int(self.__changed)
 
     def _get_translation(self):
         """We try to find the translation function (_) from the module
@@ -593,8 +1062,13 @@ class DataSet(Meta_Py3Compat):
     def _compute_title_and_comment(self):
         """
         Private method to compute title and comment of the data set
+        (the result is cached in the class)
         """
-        comp_title = self.__class__.__name__
+        klass = self.__class__
+        result = klass.__dict__.get("_title_and_comment")
+        if result is not None:
+            return result
+        comp_title = klass.__name__
         comp_comment = None
         if self.__doc__:
             doc_lines = str(self.__doc__).splitlines()
@@ -605,6 +1079,7 @@ class DataSet(Meta_Py3Compat):
                 comp_title = doc_lines.pop(0).strip()
             if doc_lines:
                 comp_comment = "\n".join([x.strip() for x in doc_lines])
+        klass._title_and_comment = comp_title, comp_comment
         return comp_title, comp_comment
 
     def get_title(self):
@@ -625,14 +1100,157 @@ class DataSet(Meta_Py3Compat):
         """
         return self.__icon
 
+    def get_cached_prop_value(self, item, realm, name, prop):
+        """
+        Return the value of item property `prop` (found in item's `realm`
+        under `name`), evaluating it only if an item value has changed
+        since the last evaluation
+        """
+        key = (item, realm, name)
+        entry = self.__props.get(key)
+        if entry is not None and entry[0] == self.__version:
+            return entry[1]
+        value = prop(self, item, item.get_value(self))
+        self.__props[key] = (self.__version, value)
+        return value
+
+    def invalidate_props(self):
+        """
+        Invalidate the cached item property values (see `cache_props`)
+        """
+        self.__version += 1
+
+    def set_changed(self, name):
+        """
+        Mark item `name` as changed (called when an item value is set)
+        """
+        self.__changed |= self._item_bits[name]
+        if self.cache_props:
+            self.__version += 1
+
+    def changed_items(self):
+        """
+        Return the names of the items changed since the dataset creation
+        or the last call to `clear_changes` (including ObjectItem items
+        whose dataset has changed items)
+        """
+        names = []
+        for item in self._items:
+            if self.__changed & self._item_bits[item._name]:
+                names.append(item._name)
+            elif isinstance(item, ObjectItem):
+                value = getattr(self, item._storage, None)
+                if isinstance(value, DataSet) and value.changed_items():
+                    names.append(item._name)
+        return names
+
+    def clear_changes(self):
+        """
+        Forget changes (e.g. after saving the dataset)
+        """
+        self.__changed = 0
+        for item in self._items:
+            if isinstance(item, ObjectItem):
+                value = getattr(self, item._storage, None)
+                if isinstance(value, DataSet):
+                    value.clear_changes()
+
     def set_defaults(self):
         """Set default values"""
-        for item in self._items:
+        if self._dict_storage:
+            self.__dict__.update(self._defaults)
+        else:
+            for attr, value in self._defaults.items():
+                setattr(self, attr, value)
+        for item in self._custom_default_items:
             item.set_default(self)
 
+    def copy(self, deep=False):
+        """
+        Return a copy of the data set (the constructor is not called)
+            * deep [bool]: if True, item values are deep-copied, otherwise
+              they are shared with the copy
+
+        Nested data sets (ObjectItem values) are always copied.
+        NumPy arrays are only duplicated by deep copies: otherwise, this
+        data set and the copy share read-only views of them (assign a new
+        array to an item of either data set to modify it).
+        """
+        import numpy as np
+        klass = self.__class__
+        clone = klass.__new__(klass)
+        if self._has_dict:
+            clone.__dict__.update(self.__dict__)
+        clone.__title = self.__title
+        clone.__comment = self.__comment
+        clone.__icon = self.__icon
+        clone.__changed = self.__changed
+        clone.__version = 0
+        clone.__props = {} if self.cache_props else None
+        for item in self._items:
+            try:
+                value = getattr(self, item._storage)
+            except AttributeError:
+                continue
+            if isinstance(value, DataSet):
+                value = value.copy(deep)
+            elif isinstance(value, np.ndarray) and not deep:
+                value = _read_only_view(value)
+                setattr(self, item._storage, value)
+            elif deep:
+                value = copy.deepcopy(value)
+            setattr(clone, item._storage, value)
+        return clone
+
     def __str__(self):
         return self.to_string(debug=False)
 
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, DataSet) or \
+           other._data_items != self._data_items:
+            return NotImplemented
+        for _difference in self._iter_differences(other, 0., 0.):
+            return False
+        return True
+
+    # Data sets are mutable and compared by value: they are not hashable
+    # (use `fingerprint` to get a key of the current item values)
+    __hash__ = None
+
+    def diff(self, other, rtol=0., atol=0.):
+        """
+        Compare item values with those of `other` (data set of the same
+        class) and return a dictionary mapping the names of the different
+        items to (value, other_value) tuples
+
+        Float values and arrays are compared with the relative and absolute
+        tolerances `rtol` and `atol` (exact comparison by default).
+        Nested data sets (ObjectItem values) are compared item by item:
+        the names of their different items are prefixed by the ObjectItem
+        name (e.g. "name.subname").
+        """
+        return {name: (value, other_value) for name, value, other_value
+                in self._iter_differences(other, rtol, atol)}
+
+    def _iter_differences(self, other, rtol, atol, prefix=""):
+        """Generate (name, value, other_value) for each different item"""
+        for item in self._data_items:
+            value = getattr(self, item._storage, None)
+            other_value = getattr(other, item._storage, None)
+            if value is other_value:
+                # Also true for default values of ObjectItem not accessed yet
+                continue
+            value = item.get_value(self)
+            other_value = item.get_value(other)
+            if isinstance(value, DataSet) and isinstance(other_value, DataSet) \
+               and value._data_items == other_value._data_items:
+                yield from value._iter_differences(other_value, rtol, atol,
+                                                   prefix + item._name + ".")
+            elif _values_differ(value, other_value, rtol, atol):
+                yield prefix + item._name, value, other_value
+
     def check(self):
         """
         Check the dataset item values
@@ -643,6 +1261,43 @@ class DataSet(Meta_Py3Compat):
                 errors.append(item._name)
         return errors
 
+    async def check_async(self, max_concurrency=16, timeout=None,
+                          executor=None):
+        """
+        Coroutine checking the dataset item values concurrently
+        (see `check_datasets_async`)
+        """
+        errors = await check_datasets_async([self], max_concurrency,
+                                            timeout, executor)
+        return errors[0]
+
+    @classmethod
+    def check_many(klass, instances):
+        """
+        Check the item values of many datasets at once
+            * instances: sequence of instances of this class or
+              DataSetBatch object (see guidata.dataset.batch)
+
+        Return a dictionary mapping each item name to a boolean array
+        which is True where the value is *not* valid (group delimiters
+        are not checked)
+        """
+        from guidata.dataset.batch import DataSetBatch, object_column
+        if not isinstance(instances, DataSetBatch):
+            instances = list(instances)
+        errors = {}
+        for item in klass._items:
+            if isinstance(item, (BeginGroup, EndGroup)):
+                continue
+            if isinstance(instances, DataSetBatch):
+                values = instances[item._name]
+            else:
+                values = object_column((item.get_value(instance)
+                                        for instance in instances),
+                                       count=len(instances))
+            errors[item._name] = ~item.check_batch(values)
+        return errors
+
     def edit(self, parent=None, apply=None, size=None):
         """
         Open a dialog box to edit data set
@@ -671,46 +1326,63 @@ class DataSet(Meta_Py3Compat):
         Return readable string representation of the data set
         If debug is True, add more details on data items
         """
+        stream = io.StringIO()
+        self.write_text(stream, debug=debug, indent=indent, align=align)
+        return stream.getvalue()
+
+    def write_text(self, stream, debug=False, indent=None, align=False):
+        """
+        Write readable string representation of the data set to `stream`
+        (file-like object): see `to_string`
+        """
         if indent is None:
             indent = "\n    "
-        txt = self.__title + ":"
-
-        def _get_label(item):
-            if debug:
-                return item._name
-            else:
-                return item.get_prop_value("display", self, "label")
-        length = 0
-        if align:
-            for item in self._items:
-                item_length = len(_get_label(item))
-                if item_length > length:
-                    length = item_length
-        for item in self._items:
+        write = stream.write
+        write(self.__title + ":")
+        if debug:
+            labels = [item._name for item in self._items]
+        else:
+            labels = [item.get_prop_value("display", self, "label")
+                      for item in self._items]
+        length = self._get_label_width(labels, debug) if align else 0
+        for item, label in zip(self._items, labels):
             if isinstance(item, ObjectItem):
+                write(indent)
                 composite_dataset = item.get_value(self)
-                txt += indent + composite_dataset.to_string(debug=debug,
-                                                            indent=indent + "  ")
+                composite_dataset.write_text(stream, debug=debug,
+                                             indent=indent + "  ")
                 continue
             elif isinstance(item, BeginGroup):
-                txt += indent + item._name + ":"
+                write(indent + item._name + ":")
                 indent += "  "
                 continue
             elif isinstance(item, EndGroup):
                 indent = indent[:-2]
                 continue
-            value = getattr(self, "_" + item._name)
+            value = getattr(self, item._storage)
             value_str = "-" if value is None else item.get_string_value(self)
-            if debug:
-                label = item._name
-            else:
-                label = item.get_prop_value("display", self, "label")
             if length:
                 label = label.ljust(length)
-            txt += indent + label + ": " + value_str
+            write(indent + label + ": " + value_str)
             if debug:
-                txt += f" ({item.__class__.__name__})"
-        return txt
+                write(f" ({item.__class__.__name__})")
+
+    def _get_label_width(self, labels, debug):
+        """Return the width of the longest item label: the result is
+        cached in the class when labels do not depend on the instance"""
+        klass = self.__class__
+        generation, widths = klass.__dict__.get("_label_widths", (None, {}))
+        if generation != DataItem.props_generation:
+            widths = {}
+            klass._label_widths = (DataItem.props_generation, widths)
+        width = widths.get(debug)
+        if width is None:
+            width = max([len(label) for label in labels], default=0)
+            if debug or not any(
+                    isinstance(item.get_prop("display", "label"), ItemProperty)
+                    for item in self._items):
+                widths[debug] = width
+        return width
 
     def accept(self, vis):
         """
@@ -720,25 +1392,58 @@ class DataSet(Meta_Py3Compat):
         for item in self._items:
             item.accept(vis)
 
-    def serialize(self, writer):
-        for item in self._items:
+    def serialize(self, writer, changed_only=False):
+        """
+        Serialize dataset items using the writer object
+        (if `changed_only` is True, only changed items are written:
+        see `changed_items`)
+        """
+        items = self._serializable_items
+        names = set(self.changed_items()) if changed_only else None
+        if self._codec is not None:
+            self._codec.serialize(self, writer, names)
+            return
+        if changed_only:
+            items = [item for item in items if item._name in names]
+        for item in items:
             with writer.group(item._name):
                 item.serialize(self, writer)
 
     def deserialize(self, reader):
-        for item in self._items:
+        if self._codec is not None:
+            self._codec.deserialize(self, reader)
+            return
+        for item in self._serializable_items:
             with reader.group(item._name):
                 try:
                     item.deserialize(self, reader)
                 except RuntimeError as error:
-                    if DEBUG_DESERIALIZE:
-                        import traceback
-                        print("DEBUG_DESERIALIZE enabled in datatypes.py",
-                              file=sys.stderr)
-                        traceback.print_stack()
-                        print(error, file=sys.stderr)
+                    _debug_deserialize(error)
                     item.set_default(self)
 
+    def fingerprint(self, digest_size=16):
+        """
+        Return a digest (bytes object of length `digest_size`) of the item
+        values, which may be used as a cache key: data sets of the same
+        class with equal item values have the same fingerprint
+
+        Arrays are hashed from their data buffer in native byte order (with
+        their dtype and shape) and nested data sets (ObjectItem values) are included, as
+        well as the values of non-serializable items (e.g. DictItem).
+        """
+        hasher = hashlib.blake2b(digest_size=digest_size)
+        self._update_fingerprint(hasher)
+        return hasher.digest()
+
+    def _update_fingerprint(self, hasher):
+        """Feed the class name and item values to the `hasher` object"""
+        hasher.update(("%s.%s{" % (self.__class__.__module__,
+                                   self.__class__.__name__)).encode())
+        for item in self._data_items:
+            hasher.update(item._name.encode() + b"=")
+            _update_fingerprint(hasher, item.get_value(self))
+        hasher.update(b"}")
+
     def read_config(self, conf, section, option):
         from guidata.userconfigio import UserConfigReader
         reader = UserConfigReader(conf, section, option)
@@ -754,6 +1459,113 @@ class DataSet(Meta_Py3Compat):
         for item in klass._items:
             item.set_prop(realm, **kwargs)
 
+    @classmethod
+    def get_dependency_graph(klass):
+        """
+        Return the dependency graph of the item properties
+        (see `build_dependency_graph`)
+
+        The graph is built with the class and rebuilt when a property
+        is changed afterwards (see `DataItem.set_prop`).
+        """
+        generation, graph = klass._dependencies
+        if generation != DataItem.props_generation:
+            graph = build_dependency_graph(klass._items)
+            klass._dependencies = (DataItem.props_generation, graph)
+        return graph
+
+    @classmethod
+    def get_dependent_items(klass, *names):
+        """
+        Return the list of items whose properties may depend on any of
+        the instance attributes `names` (e.g. item names), in item order
+        """
+        graph = klass.get_dependency_graph()
+        dependent = set(graph[None])
+        for name in names:
+            dependent.update(graph.get(name, ()))
+        return [item for item in klass._items if item in dependent]
+
+    @classmethod
+    def new_many(klass, n, **common):
+        """
+        Return a list of `n` new instances of this class, initialized to
+        default values and then to the `common` item values (keyword
+        arguments: item name and value)
+
+        The instances are shallow copies of a single template instance
+        (nested data sets excepted): this is faster than calling the
+        constructor `n` times. As with `copy`, arrays are shared by all
+        instances as read-only views.
+        If the class overrides `__init__` (which may create per-instance
+        state), the constructor is called for each instance instead.
+        """
+        import numpy as np
+        if klass.__init__ is not DataSet.__init__:
+            datasets = [klass() for _index in range(n)]
+            for dataset in datasets:
+                update_dataset(dataset, common)
+            return datasets
+        template = klass()
+        update_dataset(template, common)
+        slot_values, nested = [], []
+        for item in klass._items:
+            try:
+                value = getattr(template, item._storage)
+            except AttributeError:
+                continue
+            if isinstance(value, np.ndarray):
+                # The template is not used anymore: sharing its views is safe
+                value = _read_only_view(value)
+                setattr(template, item._storage, value)
+            if isinstance(value, DataSet):
+                nested.append((item._storage, value))
+            elif not klass._dict_storage:
+                slot_values.append((item._storage, value))
+        state = template.__dict__ if klass._has_dict else None
+        title, comment = template.__title, template.__comment
+        icon, changed = template.__icon, template.__changed
+        cache_props = klass.cache_props
+        new = klass.__new__
+        datasets = []
+        for _index in range(n):
+            dataset = new(klass)
+            if state is not None:
+                dataset.__dict__.update(state)
+            for attr, value in slot_values:
+                setattr(dataset, attr, value)
+            for attr, value in nested:
+                setattr(dataset, attr, value.copy())
+            dataset.__title = title
+            dataset.__comment = comment
+            dataset.__icon = icon
+            dataset.__changed = changed
+            dataset.__version = 0
+            dataset.__props = {} if cache_props else None
+            datasets.append(dataset)
+        return datasets
+
+    @classmethod
+    def from_records(klass, records, visible_only=False):
+        """
+        Return a list of new instances of this class, one for each of the
+        `records` (sequence of objects or dictionaries, or NumPy record
+        array: see `guidata.utils.update_datasets`)
+        """
+        from guidata.utils import update_datasets
+        datasets = klass.new_many(len(records))
+        update_datasets(datasets, records, visible_only=visible_only)
+        return datasets
+
+    @classmethod
+    def create_batch(klass, size=0):
+        """
+        Return a DataSetBatch object storing `size` records of this class
+        as NumPy columns (see guidata.dataset.batch)
+        """
+        from guidata.dataset.batch import DataSetBatch
+        return DataSetBatch(klass, size)
+
 
 class ActivableDataSet(DataSet):
     """
@@ -787,6 +1599,7 @@ class ActivableDataSet(DataSet):
         """
         self._ro = True
         self._active = self.enable
+        self.invalidate_props()
 
     def set_writeable(self):
         """
@@ -794,6 +1607,53 @@ class ActivableDataSet(DataSet):
         """
         self._ro = False
         self._active = self.enable
+        self.invalidate_props()
+
+
+def write_datasets_text(stream, datasets, debug=False, indent=None,
+                        align=False, separator="\n"):
+    """
+    Write the readable string representations of `datasets` (sequence of
+    DataSet objects or DataSetBatch object) to `stream` (file-like object),
+    separated by `separator` (see DataSet.to_string)
+    """
+    for index, dataset in enumerate(datasets):
+        if index:
+            stream.write(separator)
+        dataset.write_text(stream, debug=debug, indent=indent, align=align)
+
+
+async def check_datasets_async(datasets, max_concurrency=16, timeout=None,
+                               executor=None):
+    """
+    Coroutine checking the item values of `datasets` concurrently and
+    returning the list of invalid item names of each dataset (as
+    `DataSet.check`)
+        * max_concurrency [int]: maximum number of checks running at once
+        * timeout [float]: time (in seconds) after which a check is
+          abandoned and the item considered invalid (None: no timeout)
+        * executor [concurrent.futures.Executor]: executor running the
+          synchronous checks (None: default executor of the event loop)
+
+    Items may define a `check_value_async` coroutine method, synchronous
+    checks are run in the executor (see `DataItem.check_item_async`)
+    """
+    import asyncio
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def check_item(item, dataset):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    item.check_item_async(dataset, executor), timeout)
+            except asyncio.TimeoutError:
+                return False
+
+    results = iter(await asyncio.gather(*[check_item(item, dataset)
+                                          for dataset in datasets
+                                          for item in dataset._items]))
+    return [[item._name for item in dataset._items if not next(results)]
+            for dataset in datasets]
 
 
 class DataSetGroup(object):
@@ -836,6 +1696,15 @@ class DataSetGroup(object):
         """
         return [dataset.check() for dataset in self.datasets]
 
+    async def check_async(self, max_concurrency=16, timeout=None,
+                          executor=None):
+        """
+        Coroutine checking data set group items concurrently
+        (see `check_datasets_async`)
+        """
+        return await check_datasets_async(self.datasets, max_concurrency,
+                                          timeout, executor)
+
     def edit(self, parent=None, apply=None):
         """
         Open a dialog box to edit data set
@@ -867,6 +1736,7 @@ class BeginGroup(DataItem):
     Data item which does not represent anything
     but a begin flag to define a data set group
     """
+    _serializable = False
 
     def serialize(self, instance, writer):
         pass
@@ -883,6 +1753,7 @@ class EndGroup(DataItem):
     Data item which does not represent anything
     but an end flag to define a data set group
     """
+    _serializable = False
 
     def serialize(self, instance, writer):
         pass
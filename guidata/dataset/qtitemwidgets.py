@@ -252,8 +252,10 @@ class LineEditWidget(AbstractDataSetWidget):
                     self.set()
                 else:
                     self.parent_layout.update_dataitems()
+                values = self.parent_layout.get_watched_values()
                 cb(self.item.instance, self.item.item, value)
-                self.parent_layout.update_widgets(except_this_one=self)
+                self.parent_layout.update_changed_widgets(
+                    values, except_this_one=self)
         self.update(value)
 
     def update(self, value):
@@ -651,8 +653,10 @@ class ChoiceWidget(AbstractDataSetWidget):
                 self.set()
             else:
                 self.parent_layout.update_dataitems()
+            values = self.parent_layout.get_watched_values()
             cb(self.item.instance, self.item.item, self.value())
-            self.parent_layout.update_widgets(except_this_one=self)
+            self.parent_layout.update_changed_widgets(values,
+                                                      except_this_one=self)
 
     def initialize_widget(self):
         if self.is_radio:
@@ -834,6 +838,9 @@ class FloatArrayWidget(AbstractDataSetWidget):
             from spyder.widgets.variableexplorer import arrayeditor
         except ImportError:
             from spyderlib.widgets.variableexplorer import arrayeditor
+        if not self.arr.flags.writeable:
+            # Read-only view shared with another data set (see DataSet.copy)
+            self.arr = self.arr.copy()
         editor = arrayeditor.ArrayEditor(parent)
         if editor.setup_and_check(self.arr, title=label):
             if editor.exec_():
@@ -928,11 +935,12 @@ class ButtonWidget(AbstractDataSetWidget):
 
     def clicked(self, *args):
         self.parent_layout.update_dataitems()
+        values = self.parent_layout.get_watched_values()
         callback = self.item.get_prop_value("display", "callback")
         self.cb_value = callback(self.item.instance, self.item.item,
                                  self.cb_value, self.button.parent())
         self.set()
-        self.parent_layout.update_widgets()
+        self.parent_layout.update_changed_widgets(values)
 
 
 class DataSetWidget(AbstractDataSetWidget):
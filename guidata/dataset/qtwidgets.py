@@ -20,6 +20,8 @@ Dialog boxes used to edit data sets:
     DataSetShowLayout
 """
 
+import numpy
+
 from qtpy import QtGui, QtCore, QtWidgets
 
 from qtpy.compat import getopenfilename, getopenfilenames, getsavefilename
@@ -28,7 +30,7 @@ from guidata.configtools import get_icon
 from guidata.config import _
 
 from guidata.dataset.datatypes import (BeginGroup, EndGroup, GroupItem,
-                                       TabGroupItem)
+                                       TabGroupItem, DataSet)
 
 from guidata.dataset.qtitemwidgets import (LineEditWidget, TextEditWidget,
                                            CheckBoxWidget, ColorWidget, FileWidget, DirectoryWidget,
@@ -298,6 +300,66 @@ class DataSetEditLayout(object):
             if widget is not except_this_one:
                 widget.get()
 
+    def get_watched_values(self):
+        """Return the values of the instance attributes which are shown by
+        the widgets (item values and attributes read by item properties),
+        see `update_changed_widgets`"""
+        names = [item._name for item in self.instance._items]
+        names.extend(name for name in self.instance.get_dependency_graph()
+                     if name is not None)
+        return {name: getattr(self.instance, name, None) for name in names}
+
+    def update_changed_widgets(self, values, except_this_one=None):
+        """Refresh the widgets of the instance attributes whose value is not
+        `values` anymore (see `get_watched_values`), and of the items
+        whose properties depend on them
+
+        Mutable values (arrays, lists, nested data sets, ...) may have been
+        modified in place: their widgets are always refreshed"""
+        names = [name for name, value in values.items()
+                 if _value_changed(value, getattr(self.instance, name, None))]
+        self.update_dependent_widgets(names, except_this_one)
+
+    def update_dependent_widgets(self, names, except_this_one=None):
+        """Refresh the content and status of the widgets of the items
+        `names` and of the items whose properties depend on the instance
+        attributes `names` (see DataSet.get_dependency_graph)"""
+        items = set(self.instance.get_dependent_items(*names))
+        items.update(item for item in self.instance._items
+                     if item._name in names)
+        groups = []
+        for widget in self.widgets:
+            if widget is except_this_one:
+                continue
+            if isinstance(widget, TabGroupWidget):
+                groups.extend(group for group in widget.widgets
+                              if isinstance(group, GroupWidget))
+            elif isinstance(widget, GroupWidget):
+                groups.append(widget)
+            elif widget.item.item in items:
+                widget.get()
+                widget.set_state()
+        # Group widgets of tab groups may also be in `self.widgets`
+        for group in dict.fromkeys(groups):
+            if group is not except_this_one:
+                group.edit.update_dependent_widgets(names, except_this_one)
+
+
+# Types of the values which may be modified in place
+_MUTABLE_TYPES = (list, dict, set, numpy.ndarray, DataSet)
+
+
+def _value_changed(old, new):
+    """Return True if attribute value `new` differs from `old` (or may have
+    been modified in place)"""
+    if old is new:
+        return isinstance(new, _MUTABLE_TYPES)
+    try:
+        return bool(old != new)
+    except Exception:
+        # e.g. arrays (ambiguous truth value)
+        return True
+
 
 # Enregistrement des correspondances avec les widgets
 
@@ -10,11 +10,18 @@ Reader and Writer for the serialization of DataSets into HDF5 files
 """
 
 import sys
+import json
 from uuid import uuid1
 
 import h5py
+import numpy as np
 
-from guidata.userconfigio import BaseIOHandler, WriterMixin
+from guidata.userconfigio import BaseIOHandler, WriterMixin, ReaderMixin
+from guidata.jsonio import to_json_value, from_json_value
+
+
+#: Number of rows of the chunks of object tables (see `write_object_list`)
+TABLE_CHUNK_ROWS = 4096
 
 
 class H5Store(object):
@@ -81,9 +88,17 @@ class HDF5Writer(HDF5Handler, WriterMixin):
         group = self.get_parent_group()
         group.attrs[self.option[-1]] = ""
 
-    def write_object_list(self, seq, group_name):
+    def write_object_list(self, seq, group_name, layout="groups"):
         """Write object sequence in group.
-        Objects must implement the DataSet-like `serialize` method"""
+        Objects must implement the DataSet-like `serialize` method
+
+        layout: "groups" (one HDF5 group per object) or "table", for
+        sequences of objects of the same class: scalar values are stored
+        in a compound dataset (one row per object, one field per value),
+        arrays in companion datasets (see `write_object_table`)"""
+        if layout == "table" and seq is not None:
+            self.write_object_table(seq, group_name)
+            return
         with self.group(group_name):
             if seq is None:
                 self.write_none()
@@ -100,7 +115,189 @@ class HDF5Writer(HDF5Handler, WriterMixin):
                 self.write(ids, 'IDs')
 
 
-class HDF5Reader(HDF5Handler):
+    def write_object_table(self, seq, group_name):
+        """Write object sequence in group with the "table" layout
+        (see `write_object_list`)
+
+        The group contains:
+            * "table": compound dataset (booleans, integers, floats and
+              strings fields; other values are encoded as JSON strings)
+            * "arrays/<field>": array values (stacked in a single dataset
+              if they have the same shape, otherwise concatenated in a flat
+              "data" dataset with "offsets" and "shapes" datasets)
+            * "none": boolean dataset (rows x fields) which is True where
+              the value is None (only if there are None values)
+            * "objects_none": boolean dataset which is True where the
+              object is None (only if there are None objects)
+        and its "columns" attribute (JSON) describes the fields"""
+        rows = []
+        for obj in seq:
+            if obj is None:
+                rows.append(None)
+            else:
+                writer = _RowWriter()
+                obj.serialize(writer)
+                rows.append(writer.row)
+        with self.group(group_name):
+            parent = self.get_parent_group()
+            if group_name in parent:
+                del parent[group_name]
+            group = parent.create_group(group_name)
+            _write_table(group, rows)
+
+
+class _RowWriter(BaseIOHandler, WriterMixin):
+    """Writer capturing the values of an object as a {path: (kind, value)}
+    dictionary (see `HDF5Writer.write_object_table`)"""
+
+    def __init__(self):
+        super().__init__()
+        self.row = {}
+
+    def _capture(self, kind, val):
+        self.row["/".join(self.option)] = (kind, val)
+
+    def write_any(self, val):
+        if isinstance(val, np.generic):
+            val = val.item()
+        self._capture("any", val)
+
+    def write_bool(self, val):
+        self._capture("any", bool(val))
+
+    def write_int(self, val):
+        self._capture("any", int(val))
+
+    def write_float(self, val):
+        self._capture("any", float(val))
+
+    def write_array(self, val):
+        self._capture("array", np.asarray(val))
+
+    def write_sequence(self, val):
+        self._capture("sequence", list(val))
+
+    def write_none(self):
+        self._capture("any", None)
+
+    def write_object_list(self, seq, group_name):
+        raise ValueError("nested object lists can't be stored as a table")
+
+
+def _get_column_kind(values):
+    """Return the storage kind of a table column from its captured
+    (kind, value) tuples (None for missing values)"""
+    kinds, types = set(), set()
+    for captured in values:
+        if captured is not None and captured[1] is not None:
+            kinds.add(captured[0])
+            types.add(type(captured[1]))
+    if kinds == {"array"}:
+        return "array"
+    if "array" in kinds:
+        raise ValueError("objects can't be stored as a table: "
+                         "mixed array and non-array values")
+    if kinds == {"any"} and len(types) == 1:
+        value_type = types.pop()
+        if value_type is int:
+            if all(-2**63 <= captured[1] < 2**63 for captured in values
+                   if captured is not None and captured[1] is not None):
+                return "int"
+        elif value_type in (bool, float, str):
+            return value_type.__name__
+    return "json"
+
+
+_TABLE_DTYPES = {"bool": np.bool_, "int": np.int64, "float": np.float64,
+                 "str": h5py.string_dtype("utf-8"),
+                 "json": h5py.string_dtype("utf-8")}
+
+
+def _write_table(group, rows):
+    """Write the captured `rows` (see `_RowWriter`) in HDF5 `group`"""
+    names = {}
+    for row in rows:
+        if row is not None:
+            for name in row:
+                names.setdefault(name, None)
+    count = len(rows)
+    columns, fields = [], []
+    none_mask = np.zeros((count, len(names)), dtype=bool)
+    for index, name in enumerate(names):
+        values = [None if row is None else row.get(name) for row in rows]
+        none_mask[:, index] = [captured is None or captured[1] is None
+                               for captured in values]
+        kind = _get_column_kind(values)
+        column = {"name": name, "kind": kind}
+        if kind == "array":
+            column["dataset"] = _write_array_column(group, index, values)
+        else:
+            fields.append((name, _TABLE_DTYPES[kind], kind, values))
+        columns.append(column)
+    table = np.zeros(count, dtype=[(name, dtype)
+                                   for name, dtype, _kind, _values in fields])
+    for name, dtype, kind, values in fields:
+        if kind == "json":
+            column = [json.dumps(to_json_value(captured[1])
+                                 if captured[0] == "any" else
+                                 [to_json_value(value)
+                                  for value in captured[1]])
+                      if captured is not None and captured[1] is not None
+                      else "" for captured in values]
+        else:
+            default = "" if kind == "str" else 0
+            column = [default if captured is None or captured[1] is None
+                      else captured[1] for captured in values]
+        table[name] = column
+    if fields:
+        group.create_dataset("table", data=table,
+                             chunks=(max(1, min(count, TABLE_CHUNK_ROWS)), )
+                             if count else None)
+    if none_mask.any():
+        group.create_dataset("none", data=none_mask)
+    objects_none = np.array([row is None for row in rows], dtype=bool)
+    if objects_none.any():
+        group.create_dataset("objects_none", data=objects_none)
+    group.attrs["layout"] = "table"
+    group.attrs["count"] = count
+    group.attrs["columns"] = json.dumps(columns)
+
+
+def _write_array_column(group, index, values):
+    """Write the arrays of a table column, return the dataset name"""
+    arrays = [captured[1] if captured is not None and captured[1] is not None
+              else None for captured in values]
+    present = [array for array in arrays if array is not None]
+    dtype = np.result_type(*present)
+    if dtype.hasobject:
+        raise ValueError("objects can't be stored as a table: "
+                         "object arrays")
+    name = "arrays/%d" % index
+    shapes = {array.shape for array in present}
+    if len(shapes) == 1 and len(present) == len(arrays):
+        # Stacked arrays
+        group.create_dataset(name, data=np.stack(present).astype(dtype,
+                                                                 copy=False))
+        return name
+    # Ragged arrays: flat data, offsets and shapes (left-padded with -1)
+    ndim = max(array.ndim for array in present)
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    shapes = np.full((len(arrays), ndim), -1, dtype=np.int64)
+    for row, array in enumerate(arrays):
+        size = 0 if array is None else array.size
+        offsets[row + 1] = offsets[row] + size
+        if array is not None and array.ndim:
+            shapes[row, ndim - array.ndim:] = array.shape
+    data = np.concatenate([array.ravel() for array in present]).astype(
+        dtype, copy=False)
+    subgroup = group.create_group(name)
+    subgroup["data"] = data
+    subgroup["offsets"] = offsets
+    subgroup["shapes"] = shapes
+    return name
+
+
+class HDF5Reader(HDF5Handler, ReaderMixin):
     """Reader for HDF5 files"""
 
     def __init__(self, filename):
@@ -162,7 +359,8 @@ class HDF5Reader(HDF5Handler):
         group = self.get_parent_group()
         return list(group.attrs[self.option[-1]])
 
-    def read_object_list(self, group_name, klass, progress_callback=None):
+    def read_object_list(self, group_name, klass, progress_callback=None,
+                         start=None, stop=None, step=None, batch=False):
         """Read object sequence in group.
         Objects must implement the DataSet-like `deserialize` method.
         `klass` is the object class which constructor requires no argument.
@@ -171,8 +369,23 @@ class HDF5Reader(HDF5Handler):
         an integer argument (progress: 0 --> 100). Function returns the
         `cancel` state (True: progress dialog has been canceled, False
         otherwise)
+
+        start, stop, step: read only the objects of this slice
+
+        batch: if True, `klass` must be a DataSet class and a DataSetBatch
+        object is returned instead of a list (None objects are stored as
+        default records)
+
+        Sequences written with the "table" layout (see
+        `HDF5Writer.write_object_list`) are read column by column.
         """
+        selection = slice(start, stop, step)
         with self.group(group_name):
+            node = self.get_parent_group().get(group_name)
+            if isinstance(node, h5py.Group) and \
+               node.attrs.get("layout") == "table":
+                return _read_table(node, klass, selection, batch,
+                                   progress_callback)
             try:
                 ids = self.read('IDs', func=self.read_sequence)
             except ValueError:
@@ -180,6 +393,7 @@ class HDF5Reader(HDF5Handler):
                 self.end('IDs')
                 return
             seq = []
+            ids = ids[selection]
             count = len(ids)
             for idx, name in enumerate(ids):
                 if progress_callback is not None:
@@ -195,4 +409,170 @@ class HDF5Reader(HDF5Handler):
                         obj = klass()
                         obj.deserialize(self)
                 seq.append(obj)
+        if batch:
+            from guidata.dataset.batch import DataSetBatch
+            return DataSetBatch.from_datasets(klass, seq)
         return seq
+
+
+class _RowReader(BaseIOHandler, ReaderMixin):
+    """Reader replaying the values of a table row
+    (see `HDF5Reader.read_object_list`)"""
+
+    def __init__(self):
+        super().__init__()
+        self.row = None
+
+    def read_any(self):
+        return self.row["/".join(self.option)]
+
+
+class _ReadProbe(object):
+    """Reader returning the name of the called method, to find the data
+    items reading a single value without transforming it"""
+
+    def __getattr__(self, name):
+        return lambda: name
+
+
+#: Reader methods returning the values of table columns of each kind as is
+_DIRECT_READS = {"read_any": ("bool", "int", "float", "str", "array"),
+                 "read_float": ("float", ), "read_int": ("int", ),
+                 "read_bool": ("bool", ), "read_array": ("array", )}
+
+
+def _is_direct_item(item, kind):
+    """Return True if data item `item` may be set directly from a column of
+    `kind` (without calling its `deserialize` method)"""
+    from guidata.dataset.datatypes import DataItem
+    item_type = type(item)
+    if item_type.deserialize is not DataItem.deserialize or \
+       item_type.__set__ is not DataItem.__set__:
+        return False
+    try:
+        method = item.get_value_from_reader(_ReadProbe())
+    except Exception:
+        return False
+    if not isinstance(method, str):
+        # The value read is post-processed
+        return False
+    return kind in _DIRECT_READS.get(method, ())
+
+
+def _read_rows(dataset, selection):
+    """Read the rows of HDF5 `dataset` selected by slice `selection`"""
+    if selection.step > 0:
+        return dataset[selection]
+    return dataset[...][selection]
+
+
+def _read_column(node, column, index, rows, table, none_mask):
+    """Return the list of the values of a table column for `rows`"""
+    kind = column["kind"]
+    if kind == "array":
+        dataset = node[column["dataset"]]
+        if isinstance(dataset, h5py.Dataset):
+            values = list(_read_rows(dataset, rows))
+        else:
+            # Ragged arrays
+            offsets = dataset["offsets"][...]
+            shapes = dataset["shapes"][...]
+            indexes = range(len(offsets) - 1)[rows]
+            values = [None] * len(indexes)
+            if len(indexes):
+                first, last = min(indexes), max(indexes)
+                base = offsets[first]
+                data = dataset["data"][base:offsets[last + 1]]
+                for position, row in enumerate(indexes):
+                    shape = tuple(shapes[row][shapes[row] >= 0])
+                    if not shape and offsets[row + 1] == offsets[row]:
+                        # Missing value (see the "none" mask)
+                        continue
+                    values[position] = data[offsets[row] - base:
+                                            offsets[row + 1] - base
+                                            ].reshape(shape)
+    else:
+        values = table[column["name"]].tolist()
+        if kind == "str":
+            values = [value.decode("utf-8") if isinstance(value, bytes)
+                      else value for value in values]
+        elif kind == "json":
+            values = [from_json_value(json.loads(value)) if value else None
+                      for value in values]
+    if none_mask is not None:
+        for position in np.flatnonzero(none_mask[:, index]):
+            values[position] = None
+    return values
+
+
+def _read_table(node, klass, selection, batch, progress_callback):
+    """Read object sequence from a "table" layout group `node`"""
+    count = int(node.attrs["count"])
+    indexes = range(count)[selection]
+    # Normalized slice (stop is -1 when reading backwards up to row 0)
+    rows = slice(indexes.start, indexes.stop if indexes.stop >= 0 else None,
+                 indexes.step)
+    columns = json.loads(node.attrs["columns"])
+    size = len(indexes)
+    table = _read_rows(node["table"], rows) if "table" in node else None
+    none_mask = _read_rows(node["none"], rows) if "none" in node else None
+    objects_none = np.zeros(size, dtype=bool)
+    if "objects_none" in node:
+        objects_none = _read_rows(node["objects_none"], rows)
+    values = {column["name"]: _read_column(node, column, index, rows,
+                                           table, none_mask)
+              for index, column in enumerate(columns)}
+    if batch:
+        datasets = klass.create_batch(size)
+    elif hasattr(klass, "new_many"):
+        datasets = klass.new_many(size)
+    else:
+        datasets = [klass() for _index in range(size)]
+    if hasattr(klass, "_serializable_items"):
+        items = klass._serializable_items
+    else:
+        # Objects with a DataSet-like `deserialize` method
+        items = None
+    # Items set column by column
+    kinds = {column["name"]: column["kind"] for column in columns}
+    replayed = []
+    for item in items or ():
+        name = item._name
+        if name not in kinds or not _is_direct_item(item, kinds[name]):
+            replayed.append(item)
+            continue
+        column = values.pop(name)
+        if batch:
+            # None objects are stored as default records
+            for position in np.flatnonzero(objects_none):
+                column[position] = datasets[name][position]
+            if datasets[name].dtype != object and None in column:
+                raise ValueError("None values of item %r can't be stored "
+                                 "in a native batch column" % name)
+            datasets[name] = column
+        else:
+            for dataset, value in zip(datasets, column):
+                item.__set__(dataset, value)
+    # Other items: replay the row values through their `deserialize` method
+    if replayed or items is None:
+        reader = _RowReader()
+        names = list(values)
+        for position, dataset in enumerate(datasets):
+            if progress_callback is not None and \
+               position % TABLE_CHUNK_ROWS == 0:
+                if progress_callback(int(100 * float(position) / size)):
+                    datasets = datasets[:position]
+                    break
+            if objects_none[position]:
+                continue
+            reader.row = {name: values[name][position] for name in names}
+            if items is None:
+                dataset.deserialize(reader)
+                continue
+            for item in replayed:
+                with reader.group(item._name):
+                    item.deserialize(dataset, reader)
+    if batch:
+        return datasets
+    return [None if is_none else dataset
+            for dataset, is_none in zip(datasets, objects_none)]
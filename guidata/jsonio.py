@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed under the terms of the CECILL License
+# (see guidata/__init__.py for details)
+
+"""
+Reader and Writer for the serialization of DataSets into JSON documents
+(see guidata.hdf5io for the HDF5 reader/writer)
+
+Groups are JSON objects and object lists (see `write_object_list`) are JSON
+arrays. NumPy arrays are stored as base64-encoded binary data or, when
+writing to a file with ``arrays="sidecar"``, in a binary sidecar file
+(file name + ".bin") referenced by their offset.
+
+JSON Lines helpers (`write_json_lines`, `iter_json_lines`) stream long
+sequences of data sets: one JSON document per line.
+
+Documents are strict JSON: non-finite floats (NaN, infinities) are stored
+as {"__float__": "nan"} objects (see `to_json_value`).
+"""
+
+import json
+import math
+import base64
+
+import numpy as np
+
+from guidata.userconfigio import BaseIOHandler, WriterMixin, ReaderMixin
+
+
+#: Alignment (in bytes) of the arrays stored in sidecar files
+SIDECAR_ALIGNMENT = 64
+
+
+class JSONHandler(BaseIOHandler):
+    """Base JSON I/O Handler object"""
+
+    def __init__(self, filename=None):
+        super().__init__()
+        self.filename = filename
+        self.json_data = {}
+
+    def get_parent_group(self):
+        """Return the JSON object (or array) containing the current option"""
+        parent = self.json_data
+        for option in self.option[:-1]:
+            if isinstance(parent, list):
+                parent = parent[option]
+            else:
+                parent = parent.setdefault(option, {})
+        return parent
+
+
+class JSONWriter(JSONHandler, WriterMixin):
+    """
+    Writer for JSON documents
+        * filename [string]: file written by `close` (optional: see also
+          `get_json`)
+        * arrays [string]: "base64" (arrays are embedded in the document)
+          or "sidecar" (arrays are written in the binary file
+          filename + ".bin", requires a file name)
+    """
+
+    def __init__(self, filename=None, arrays="base64"):
+        super().__init__(filename)
+        if arrays not in ("base64", "sidecar"):
+            raise ValueError("unknown arrays storage %r" % arrays)
+        if arrays == "sidecar" and filename is None:
+            raise ValueError("sidecar arrays require a file name")
+        self.arrays = arrays
+        self.sidecar = None
+
+    def write_any(self, val):
+        self.get_parent_group()[self.option[-1]] = to_json_value(val)
+
+    write_bool = write_int = write_float = write_any
+
+    def write_array(self, val):
+        val = np.asarray(val)
+        if val.dtype.hasobject:
+            data = {"__ndarray__": None, "dtype": "|O",
+                    "data": [to_json_value(element) for element in val.flat]}
+        elif self.arrays == "sidecar":
+            data = {"__ndarray__": "sidecar",
+                    "offset": self._write_sidecar(val)}
+        else:
+            data = {"__ndarray__": base64.b64encode(
+                np.ascontiguousarray(val)).decode("ascii")}
+        data["dtype"] = val.dtype.str
+        data["shape"] = list(val.shape)
+        self.get_parent_group()[self.option[-1]] = data
+
+    def _write_sidecar(self, val):
+        """Write array `val` in the sidecar file and return its offset"""
+        if self.sidecar is None:
+            self.sidecar = open(self.filename + ".bin", "wb")
+        offset = self.sidecar.tell()
+        padding = -offset % SIDECAR_ALIGNMENT
+        if padding:
+            self.sidecar.write(b"\0" * padding)
+            offset += padding
+        self.sidecar.write(np.ascontiguousarray(val).data)
+        return offset
+
+    def write_sequence(self, val):
+        self.get_parent_group()[self.option[-1]] = [to_json_value(element)
+                                                    for element in val]
+
+    def write_none(self):
+        self.get_parent_group()[self.option[-1]] = None
+
+    def write_object_list(self, seq, group_name):
+        """Write object sequence in group (as a JSON array).
+        Objects must implement the DataSet-like `serialize` method"""
+        with self.group(group_name):
+            if seq is None:
+                self.write_none()
+            else:
+                objects = []
+                self.get_parent_group()[self.option[-1]] = objects
+                for index, obj in enumerate(seq):
+                    if obj is None:
+                        objects.append(None)
+                    else:
+                        objects.append({})
+                        with self.group(index):
+                            obj.serialize(self)
+
+    def get_json(self, indent=None):
+        """Return the JSON document (string)"""
+        return json.dumps(self.json_data, indent=indent, allow_nan=False)
+
+    def close(self):
+        """Write the JSON document to file (if a file name was given)"""
+        if self.sidecar is not None:
+            self.sidecar.close()
+            self.sidecar = None
+        if self.filename is not None:
+            with open(self.filename, "w") as fdesc:
+                json.dump(self.json_data, fdesc, allow_nan=False)
+
+
+class JSONReader(JSONHandler, ReaderMixin):
+    """
+    Reader for JSON documents
+        * filename [string]: JSON file name (optional)
+        * json_data [string or dict]: JSON document (if no file name is given)
+    """
+
+    def __init__(self, filename=None, json_data=None):
+        super().__init__(filename)
+        if filename is not None:
+            with open(filename) as fdesc:
+                json_data = json.load(fdesc)
+        elif isinstance(json_data, (str, bytes)):
+            json_data = json.loads(json_data)
+        self.json_data = json_data
+
+    def read_any(self):
+        value = self.get_parent_group()[self.option[-1]]
+        if isinstance(value, dict) and "__ndarray__" in value:
+            return self._decode_array(value)
+        return from_json_value(value)
+
+    def _decode_array(self, data):
+        """Return the array encoded in the `data` dictionary"""
+        dtype = np.dtype(data["dtype"])
+        shape = tuple(data["shape"])
+        storage = data["__ndarray__"]
+        if storage is None:
+            array = np.empty(len(data["data"]), dtype=object)
+            array[:] = [from_json_value(element) for element in data["data"]]
+        elif storage == "sidecar":
+            count = int(np.prod(shape))
+            array = np.fromfile(self.filename + ".bin", dtype=dtype,
+                                count=count, offset=data["offset"])
+        else:
+            # bytearray: the array is writeable
+            array = np.frombuffer(bytearray(base64.b64decode(storage)),
+                                  dtype=dtype)
+        return array.reshape(shape)
+
+    def read_object_list(self, group_name, klass, progress_callback=None):
+        """Read object sequence in group.
+        Objects must implement the DataSet-like `deserialize` method.
+        `klass` is the object class which constructor requires no argument.
+
+        progress_callback: if not None, this function is called with
+        an integer argument (progress: 0 --> 100). Function returns the
+        `cancel` state (True: progress dialog has been canceled, False
+        otherwise)
+        """
+        with self.group(group_name):
+            objects = self.get_parent_group()[self.option[-1]]
+            if objects is None:
+                # None was saved instead of list of objects
+                return
+            seq = []
+            count = len(objects)
+            for index, data in enumerate(objects):
+                if progress_callback is not None:
+                    if progress_callback(int(100 * float(index) / count)):
+                        break
+                if data is None:
+                    obj = None
+                else:
+                    obj = klass()
+                    with self.group(index):
+                        obj.deserialize(self)
+                seq.append(obj)
+        return seq
+
+
+def to_json_value(value):
+    """Return `value` converted to a JSON-compatible value (NumPy scalars
+    and bytes objects are converted, non-finite floats are encoded as
+    {"__float__": "nan"} objects, lists, tuples and dictionaries are
+    converted element by element, other values are returned as is)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isfinite(value):
+            return value
+        return {"__float__": repr(value)}
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(element) for element in value]
+    if isinstance(value, dict):
+        return {key: to_json_value(element)
+                for key, element in value.items()}
+    return value
+
+
+def from_json_value(value):
+    """Return the value encoded by `to_json_value` (JSON-compatible
+    `value`)"""
+    if isinstance(value, list):
+        return [from_json_value(element) for element in value]
+    if isinstance(value, dict):
+        if len(value) == 1 and "__float__" in value:
+            return float(value["__float__"])
+        return {key: from_json_value(element)
+                for key, element in value.items()}
+    return value
+
+
+def write_json_lines(stream, objects):
+    """
+    Write `objects` (iterable of objects implementing the DataSet-like
+    `serialize` method) to the text `stream`: one JSON document per line
+    (arrays are embedded as base64 data)
+    """
+    for obj in objects:
+        writer = JSONWriter()
+        obj.serialize(writer)
+        stream.write(writer.get_json())
+        stream.write("\n")
+
+
+def iter_json_lines(stream, klass):
+    """
+    Read the JSON documents written by `write_json_lines` from the text
+    `stream` and yield new instances of `klass` (class which constructor
+    requires no argument, implementing the DataSet-like `deserialize`
+    method)
+    """
+    for line in stream:
+        if line.strip():
+            obj = klass()
+            obj.deserialize(JSONReader(json_data=line))
+            yield obj
@@ -16,6 +16,8 @@ UserConfig reader/writer objects
 import collections
 import datetime
 
+import numpy as np
+
 
 class GroupContext(object):
     """Group context object"""
@@ -73,44 +75,177 @@ class UserConfigIOHandler(BaseIOHandler):
         return GroupContext(self, option)
 
 
+_WRITERS = {}  # type -> function(writer, value)
+_writers_cache = {}  # type -> function found along the type MRO
+_READERS = {}  # type -> function(reader)
+_readers_cache = {}
+
+
+def register_writer(klass, function):
+    """
+    Register `function` as the function writing the values of type `klass`
+    (and of its subclasses, unless they are registered too) with method
+    `WriterMixin.write`: `function(writer, value)`
+    """
+    _WRITERS[klass] = function
+    _writers_cache.clear()
+
+
+def register_reader(klass, function):
+    """
+    Register `function` as the function reading the values of type `klass`
+    (and of its subclasses, unless they are registered too) with method
+    `ReaderMixin.read_value`: `function(reader)` returns the value
+    """
+    _READERS[klass] = function
+    _readers_cache.clear()
+
+
+def _get_function(registry, cache, klass, default):
+    """Return the function registered for the nearest class in the MRO of
+    `klass` (or `default`), caching the result"""
+    try:
+        return cache[klass]
+    except KeyError:
+        pass
+    for base in klass.__mro__:
+        if base in registry:
+            function = registry[base]
+            break
+    else:
+        function = default
+    cache[klass] = function
+    return function
+
+
+def _write_other(writer, val):
+    """Write value of a type without registered writer function"""
+    if np.isscalar(val):
+        writer.write_any(val)
+    elif hasattr(val, 'serialize') and isinstance(val.serialize,
+                                                  collections.Callable):
+        # The object has a DataSet-like `serialize` method
+        val.serialize(writer)
+    else:
+        raise NotImplementedError("cannot serialize %r of type %r" %
+                                  (val, type(val)))
+
+
+def _read_other(reader):
+    """Read value of a type without registered reader function"""
+    return reader.read_any()
+
+
+register_writer(bool, lambda writer, val: writer.write_bool(val))
+register_writer(int, lambda writer, val: writer.write_int(val))
+register_writer(float, lambda writer, val: writer.write_float(val))
+register_writer(str, lambda writer, val: writer.write_any(val))
+register_writer(np.ndarray, lambda writer, val: writer.write_array(val))
+register_writer(type(None), lambda writer, val: writer.write_none())
+register_writer(list, lambda writer, val: writer.write_sequence(val))
+register_writer(tuple, lambda writer, val: writer.write_sequence(val))
+register_writer(datetime.datetime,
+                lambda writer, val: writer.write_float(val.timestamp()))
+register_writer(datetime.date,
+                lambda writer, val: writer.write_int(val.toordinal()))
+
+register_reader(bool, lambda reader: reader.read_bool())
+register_reader(int, lambda reader: reader.read_int())
+register_reader(float, lambda reader: reader.read_float())
+register_reader(str, lambda reader: reader.read_any())
+register_reader(np.ndarray, lambda reader: reader.read_array())
+register_reader(list, lambda reader: list(reader.read_sequence()))
+register_reader(tuple, lambda reader: tuple(reader.read_sequence()))
+register_reader(datetime.datetime, lambda reader:
+                datetime.datetime.fromtimestamp(reader.read_float()))
+register_reader(datetime.date, lambda reader:
+                datetime.date.fromordinal(reader.read_int()))
+
+
 class WriterMixin(object):
 
     def write(self, val, group_name=None):
         """Write value using the appropriate routine depending on value type
+        (see `register_writer`)
 
         group_name: if None, writing the value in current group"""
-        import numpy as np
         if group_name:
             self.begin(group_name)
-        if isinstance(val, bool):
-            self.write_bool(val)
-        elif isinstance(val, int):
-            self.write_int(val)
-        elif isinstance(val, float):
-            self.write_float(val)
-        elif isinstance(val, str):
-            self.write_any(val)
-        elif isinstance(val, np.ndarray):
-            self.write_array(val)
-        elif np.isscalar(val):
-            self.write_any(val)
-        elif val is None:
-            self.write_none()
-        elif isinstance(val, (list, tuple)):
-            self.write_sequence(val)
-        elif isinstance(val, datetime.datetime):
-            self.write_float(val.timestamp())
-        elif isinstance(val, datetime.date):
-            self.write_int(val.toordinal())
-        elif hasattr(val, 'serialize') and isinstance(val.serialize,
-                                                      collections.Callable):
-            # The object has a DataSet-like `serialize` method
-            val.serialize(self)
+        write_value = _get_function(_WRITERS, _writers_cache, type(val),
+                                    _write_other)
+        write_value(self, val)
+        if group_name:
+            self.end(group_name)
+
+
+class ReaderMixin(object):
+    """Reader methods built on the `read_any` method of the reader, which
+    returns the value at the current option (KeyError is raised if there
+    is no such value)"""
+
+    def read(self, group_name=None, func=None, instance=None):
+        """Read value within current group or group_name.
+
+        Optional argument `instance` is an object which
+        implements the DataSet-like `deserialize` method."""
+        if group_name:
+            self.begin(group_name)
+        if instance is None:
+            if func is None:
+                func = self.read_any
+            val = func()
+        elif self._is_none():
+            # The object was None when serializing it
+            val = None
         else:
-            raise NotImplementedError("cannot serialize %r of type %r" %
-                                      (val, type(val)))
+            instance.deserialize(self)
+            val = instance
+        if group_name:
+            self.end(group_name)
+        return val
+
+    def _is_none(self):
+        """Return True if None was written at the current option"""
+        try:
+            return self.read_any() is None
+        except KeyError:
+            # This is a group
+            return False
+
+    def read_bool(self):
+        val = self.read_any()
+        if val is not None:
+            return bool(val)
+
+    def read_int(self):
+        val = self.read_any()
+        if val is not None:
+            return int(val)
+
+    def read_float(self):
+        val = self.read_any()
+        if val is not None:
+            return float(val)
+
+    def read_array(self):
+        return self.read_any()
+
+    def read_sequence(self):
+        return list(self.read_any())
+
+    def read_value(self, klass, group_name=None):
+        """Read value of type `klass` using the appropriate routine
+        (see `register_reader`, default: `read_any`)
+
+        group_name: if None, reading the value in current group"""
+        if group_name:
+            self.begin(group_name)
+        read_value = _get_function(_READERS, _readers_cache, klass,
+                                   _read_other)
+        val = read_value(self)
         if group_name:
             self.end(group_name)
+        return val
 
 
 class UserConfigWriter(UserConfigIOHandler, WriterMixin):
@@ -126,7 +261,7 @@ class UserConfigWriter(UserConfigIOHandler, WriterMixin):
         self.write_any(None)
 
 
-class UserConfigReader(UserConfigIOHandler):
+class UserConfigReader(UserConfigIOHandler, ReaderMixin):
 
     def read_any(self):
         option = "/".join(self.option)
@@ -12,7 +12,14 @@ The ``guidata.utils`` module provides various utility helper functions
 (pure python).
 """
 
+import os
+import re
+import math
 import sys
+import stat
+import time
+import functools
+import threading
 import os.path as osp
 
 
@@ -44,18 +51,106 @@ def update_dataset(dest, source, visible_only=False):
     for item in dest._items:
         key = item._name
         if hasattr(source, key):
-            try:
-                hide = item.get_prop_value("display", source, "hide", False)
-            except AttributeError:
-                # FIXME: Remove this try...except
-                hide = False
-            if visible_only and hide:
+            if visible_only and _is_hidden(item, source):
                 continue
             setattr(dest, key, getattr(source, key))
         elif isinstance(source, dict) and key in source:
             setattr(dest, key, source[key])
 
 
+def _is_hidden(item, source):
+    """Return True if `item` is hidden when displayed for `source`"""
+    try:
+        return item.get_prop_value("display", source, "hide", False)
+    except AttributeError:
+        # FIXME: Remove this try...except
+        return False
+
+
+def _get_update_keys(klass, visible_only):
+    """Return the list of (item, key, check_hide) tuples used to update
+    the datasets of class `klass` (see `update_datasets`)"""
+    from guidata.dataset.datatypes import ItemProperty
+    keys = []
+    for item in klass._items:
+        check_hide = False
+        if visible_only:
+            hide = item.get_prop("display", "hide", False)
+            if isinstance(hide, ItemProperty):
+                # Visibility depends on the source object
+                check_hide = True
+            elif hide:
+                continue
+        keys.append((item, item._name, check_hide))
+    return keys
+
+
+def update_datasets(dests, sources, visible_only=False):
+    """
+    Update many datasets at once: this is equivalent to calling
+    `update_dataset(dest, source, visible_only)` for each (dest, source)
+    pair, but the item keys and their visibility are computed once per
+    dataset class
+
+    dests may be a sequence of DataSet objects or a DataSetBatch object,
+    whereas sources may be:
+        * a sequence of objects or dictionaries (see update_dataset)
+        * or a NumPy record array with matching field names (like
+          dictionaries, records are not subject to `visible_only`)
+    """
+    from guidata.dataset.batch import DataSetBatch
+    if len(dests) != len(sources):
+        raise ValueError("dests and sources must have the same length")
+    fields = getattr(getattr(sources, "dtype", None), "names", None)
+    if isinstance(dests, DataSetBatch):
+        keys = _get_update_keys(dests.klass, visible_only)
+        for item, key, check_hide in keys:
+            if key not in dests._columns:
+                continue
+            if fields is not None:
+                if key in fields:
+                    dests[key] = sources[key]
+                continue
+            column = dests[key]
+            values = []
+            changed = False
+            for index, source in enumerate(sources):
+                if hasattr(source, key):
+                    if not (check_hide and _is_hidden(item, source)):
+                        values.append(getattr(source, key))
+                        changed = True
+                        continue
+                elif isinstance(source, dict) and key in source:
+                    values.append(source[key])
+                    changed = True
+                    continue
+                values.append(column[index])
+            if changed:
+                dests[key] = values
+        return
+    if fields is not None:
+        columns = [(key, sources[key].tolist()) for key in fields]
+        for index, dest in enumerate(dests):
+            for key, values in columns:
+                if key in dest._item_bits:
+                    setattr(dest, key, values[index])
+        return
+    cache = {}
+    for dest, source in zip(dests, sources):
+        klass = dest.__class__
+        keys = cache.get(klass)
+        if keys is None:
+            keys = cache[klass] = _get_update_keys(klass, visible_only)
+        is_dict = isinstance(source, dict)
+        for item, key, check_hide in keys:
+            if hasattr(source, key):
+                if check_hide and _is_hidden(item, source):
+                    continue
+                setattr(dest, key, getattr(source, key))
+            elif is_dict and key in source:
+                setattr(dest, key, source[key])
+
+
 def restore_dataset(source, dest):
     """
     Restore `dest` dataset items from `source` dataset
@@ -78,6 +173,270 @@ def restore_dataset(source, dest):
             dest[key] = value
 
 
+def restore_datasets(sources, dests):
+    """
+    Restore many `dests` objects at once: this is equivalent to calling
+    `restore_dataset(source, dest)` for each (source, dest) pair
+
+    sources may be a sequence of DataSet objects or a DataSetBatch object
+    """
+    from guidata.dataset.batch import DataSetBatch
+    if len(dests) != len(sources):
+        raise ValueError("dests and sources must have the same length")
+    if not isinstance(sources, DataSetBatch):
+        for source, dest in zip(sources, dests):
+            restore_dataset(source, dest)
+        return
+    rows = [{} for _index in range(len(sources))]
+    for item in sources.items:
+        for row, value in zip(rows, sources[item._name].tolist()):
+            row[item._name] = value
+    for row, dest in zip(rows, dests):
+        is_dict = isinstance(dest, dict)
+        for key, value in row.items():
+            if hasattr(dest, key):
+                try:
+                    setattr(dest, key, value)
+                except AttributeError:
+                    # This attribute is a property, skipping this iteration
+                    continue
+            elif is_dict:
+                dest[key] = value
+
+
+#: Time (in seconds) during which the result of a file system check
+#: is reused (see `get_path_kind`)
+STAT_CACHE_TTL = 2.
+_STAT_CACHE_MAXSIZE = 100000
+_stat_cache = {}  # path -> (time of the check, kind)
+_stat_cache_lock = threading.Lock()
+
+
+def _stat_path_kind(path):
+    """Return the kind of `path` (see `get_path_kind`), without cache"""
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return None
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    return "other"
+
+
+def _store_path_kinds(kinds, now):
+    """Store the {path: kind} dictionary in the file system check cache"""
+    with _stat_cache_lock:
+        if len(_stat_cache) + len(kinds) > _STAT_CACHE_MAXSIZE:
+            _stat_cache.clear()
+        for path, kind in kinds.items():
+            _stat_cache[path] = (now, kind)
+
+
+def get_path_kind(path, ttl=None):
+    """
+    Return the kind of `path`: "file", "dir", "other" (e.g. device) or None
+    if path does not exist
+
+    The result is cached during `ttl` seconds (default: STAT_CACHE_TTL),
+    so that checking the same path again (e.g. each time a path is edited
+    in a dialog box) does not access the file system again
+    """
+    if ttl is None:
+        ttl = STAT_CACHE_TTL
+    now = time.monotonic()
+    entry = _stat_cache.get(path)
+    if entry is not None and now - entry[0] < ttl:
+        return entry[1]
+    kind = _stat_path_kind(path)
+    _store_path_kinds({path: kind}, now)
+    return kind
+
+
+def get_path_kinds(paths, ttl=None, max_workers=8):
+    """
+    Return the list of the kinds of `paths` (see `get_path_kind`)
+
+    Paths which are not in the cache are checked concurrently, using a
+    pool of `max_workers` threads (file system calls release the GIL, so
+    that the latency of network file systems is not paid for each path)
+    """
+    if ttl is None:
+        ttl = STAT_CACHE_TTL
+    now = time.monotonic()
+    kinds = {}
+    for path in paths:
+        if path not in kinds:
+            entry = _stat_cache.get(path)
+            if entry is not None and now - entry[0] < ttl:
+                kinds[path] = entry[1]
+            else:
+                kinds[path] = False  # not checked yet
+    unknown = [path for path, kind in kinds.items() if kind is False]
+    if len(unknown) > 1 and max_workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(min(max_workers, len(unknown))) as executor:
+            checked = dict(zip(unknown, executor.map(_stat_path_kind,
+                                                     unknown)))
+    else:
+        checked = {path: _stat_path_kind(path) for path in unknown}
+    _store_path_kinds(checked, now)
+    kinds.update(checked)
+    return [kinds[path] for path in paths]
+
+
+def clear_stat_cache():
+    """Clear the file system check cache (see `get_path_kind`)"""
+    with _stat_cache_lock:
+        _stat_cache.clear()
+
+
+_EXPRESSION_TOKEN = re.compile(r"(\d+\.?\d*(?:[eE][+-]?\d+)?"
+                               r"|\.\d+(?:[eE][+-]?\d+)?)"
+                               r"|(\*\*|[-+*/()])")
+#: Maximum size (in bits) of the integers computed by `evaluate_expression`
+#: (larger results would take too long to compute, e.g. "9**9**9", and are
+#: larger than the largest float anyway)
+MAX_INTEGER_BITS = 1024
+#: Maximum nesting depth (parentheses, unary operators and exponents) of the
+#: expressions evaluated by `evaluate_expression`
+MAX_EXPRESSION_DEPTH = 100
+
+
+def _check_integer_size(value):
+    """Return `value`, raising OverflowError if it is an integer larger
+    than MAX_INTEGER_BITS bits"""
+    if isinstance(value, int) and value.bit_length() > MAX_INTEGER_BITS:
+        raise OverflowError("integer is too large")
+    return value
+
+
+class _ExpressionParser(object):
+    """Recursive descent parser evaluating arithmetic expressions
+    (see `evaluate_expression`)"""
+
+    def __init__(self, text):
+        self.tokens = []
+        position = 0
+        while position < len(text):
+            match = _EXPRESSION_TOKEN.match(text, position)
+            if match is None:
+                raise ValueError("invalid expression: %r" % text)
+            number, operator = match.groups()
+            if number is not None:
+                if number.isdigit():
+                    value = _check_integer_size(int(number))
+                    self.tokens.append(("number", value))
+                else:
+                    self.tokens.append(("number", float(number)))
+            else:
+                self.tokens.append((operator, None))
+            position = match.end()
+        self.tokens.append(("end", None))
+        self.index = 0
+        self.depth = 0
+
+    def next(self, *expected):
+        """Consume and return the next token if its kind is in `expected`"""
+        kind, value = self.tokens[self.index]
+        if kind not in expected:
+            return None
+        self.index += 1
+        return kind, value
+
+    def parse(self):
+        """Return the value of the whole expression"""
+        value = self.expression()
+        if self.next("end") is None:
+            raise ValueError("unexpected token")
+        return value
+
+    def expression(self):
+        """expression := term (('+' | '-') term)*"""
+        value = self.term()
+        while True:
+            token = self.next("+", "-")
+            if token is None:
+                return value
+            if token[0] == "+":
+                value = _check_integer_size(value + self.term())
+            else:
+                value = _check_integer_size(value - self.term())
+
+    def term(self):
+        """term := factor (('*' | '/') factor)*"""
+        value = self.factor()
+        while True:
+            token = self.next("*", "/")
+            if token is None:
+                return value
+            if token[0] == "*":
+                # Operands are bounded: the product is cheap to compute
+                value = _check_integer_size(value * self.factor())
+            else:
+                value = value / self.factor()
+
+    def factor(self):
+        """factor := ('+' | '-') factor | power"""
+        # Every nested expression is parsed by a nested call of this method
+        if self.depth >= MAX_EXPRESSION_DEPTH:
+            raise ValueError("expression is too deeply nested")
+        self.depth += 1
+        try:
+            token = self.next("+", "-")
+            if token is None:
+                return self.power()
+            if token[0] == "+":
+                return +self.factor()
+            return -self.factor()
+        finally:
+            self.depth -= 1
+
+    def power(self):
+        """power := atom ['**' factor]"""
+        value = self.atom()
+        if self.next("**") is None:
+            return value
+        exponent = self.factor()
+        if isinstance(exponent, int) and isinstance(value, int) \
+           and exponent > 0 and abs(value) > 1:
+            # Check the size of the result before computing it
+            if exponent > MAX_INTEGER_BITS or \
+               exponent * math.log2(abs(value)) > MAX_INTEGER_BITS + 1:
+                raise OverflowError("integer is too large")
+            return _check_integer_size(value ** exponent)
+        return value ** exponent
+
+    def atom(self):
+        """atom := number | '(' expression ')'"""
+        token = self.next("number", "(")
+        if token is None:
+            raise ValueError("number or parenthesis expected")
+        if token[0] == "number":
+            return token[1]
+        value = self.expression()
+        if self.next(")") is None:
+            raise ValueError("closing parenthesis expected")
+        return value
+
+
+@functools.lru_cache(maxsize=4096)
+def evaluate_expression(text):
+    """
+    Return the value of the arithmetic expression `text` (string): numbers
+    (e.g. "2", "1.5", ".5e-3", "1E6"), operators + - * / ** and parentheses,
+    with Python operator precedence
+
+    Unlike `eval`, no other Python expression is accepted (ValueError is
+    raised, as well as for expressions nested deeper than
+    MAX_EXPRESSION_DEPTH). ArithmeticError is raised when the value can't be computed
+    (e.g. division by zero) or when an integer is larger than
+    MAX_INTEGER_BITS bits. Results are cached (LRU cache).
+    """
+    return _ExpressionParser(text).parse()
+
+
 def get_module_path(modname):
     """Return module *modname* base path"""
     module = sys.modules.get(modname, __import__(modname))